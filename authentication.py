@@ -0,0 +1,332 @@
+"""
+Módulo de autenticação de usuários do sistema de feira livre.
+
+As senhas são armazenadas em ``usuarios.senha_hash`` com scrypt, uma função de
+derivação de chave com alto custo de memória. A verificação é executada em um
+pool limitado de processos, para que o custo de CPU do login não bloqueie o
+interpretador que atende as demais requisições.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from database_operations import DatabaseOperations
+
+# Parâmetros do scrypt: 128 * N * r bytes de memória (16 MiB) por verificação
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+
+
+def _b64(dados):
+    """Codifica bytes em base64 sem preenchimento.
+
+    Args:
+        dados (bytes): Dados a codificar
+
+    Returns:
+        str: Texto em base64
+    """
+    return base64.b64encode(dados).decode('ascii').rstrip('=')
+
+
+def _unb64(texto):
+    """Decodifica texto em base64 sem preenchimento.
+
+    Args:
+        texto (str): Texto em base64
+
+    Returns:
+        bytes: Dados decodificados
+    """
+    return base64.b64decode(texto + '=' * (-len(texto) % 4))
+
+
+# Hash verificado quando o email não corresponde a um usuário ativo, para que a
+# resposta leve o mesmo tempo de uma senha incorreta
+_HASH_FICTICIO = (
+    f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$'
+    f'{_b64(bytes(16))}${_b64(bytes(SCRYPT_DKLEN))}'
+)
+
+
+def gerar_hash_senha(senha, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Gera o hash de uma senha para gravação em ``usuarios.senha_hash``.
+
+    Args:
+        senha (str): Senha em texto puro
+        n (int, optional): Fator de custo do scrypt. Defaults to SCRYPT_N.
+        r (int, optional): Tamanho de bloco do scrypt. Defaults to SCRYPT_R.
+        p (int, optional): Paralelismo do scrypt. Defaults to SCRYPT_P.
+
+    Returns:
+        str: Hash no formato 'scrypt$n$r$p$sal$chave'
+    """
+    sal = os.urandom(16)
+    chave = hashlib.scrypt(senha.encode('utf-8'), salt=sal, n=n, r=r, p=p,
+                           maxmem=256 * n * r, dklen=SCRYPT_DKLEN)
+    return f'scrypt${n}${r}${p}${_b64(sal)}${_b64(chave)}'
+
+
+def verificar_senha(senha, senha_hash):
+    """Verifica uma senha contra um hash gerado por ``gerar_hash_senha``.
+
+    Hashes em outro formato são considerados inválidos.
+
+    Args:
+        senha (str): Senha em texto puro
+        senha_hash (str): Hash armazenado
+
+    Returns:
+        bool: True se a senha corresponde ao hash
+    """
+    try:
+        algoritmo, n, r, p, sal, chave = senha_hash.split('$')
+        if algoritmo != 'scrypt':
+            return False
+        n, r, p = int(n), int(r), int(p)
+        esperado = _unb64(chave)
+        calculado = hashlib.scrypt(senha.encode('utf-8'), salt=_unb64(sal), n=n, r=r, p=p,
+                                   maxmem=256 * n * r, dklen=len(esperado))
+    except ValueError:
+        return False
+    return hmac.compare_digest(calculado, esperado)
+
+
+class TentativasExcedidasError(RuntimeError):
+    """Erro lançado quando um email excede o limite de tentativas de login."""
+
+
+class Autenticador:
+    """Classe que autentica usuários verificando as senhas em um pool de processos."""
+
+    def __init__(self, db_name='feira_livre.db', max_processos=None, max_pendentes=None,
+                 max_tentativas=5, janela_tentativas=60.0,
+                 ttl_email_inexistente=30.0, max_emails_cache=10000):
+        """Inicializa o autenticador.
+
+        Args:
+            db_name (str): Nome do arquivo do banco de dados. Padrão: 'feira_livre.db'
+            max_processos (int, optional): Processos de verificação. Padrão: os.cpu_count()
+            max_pendentes (int, optional): Verificações simultâneas aceitas (em execução
+                ou na fila). Padrão: 4 * max_processos
+            max_tentativas (int): Tentativas permitidas por email na janela. Padrão: 5
+            janela_tentativas (float): Duração da janela de tentativas, em segundos. Padrão: 60
+            ttl_email_inexistente (float): Segundos em que um email desconhecido permanece
+                em cache. Padrão: 30
+            max_emails_cache (int): Emails mantidos em cada cache em memória; com o
+                cache de tentativas cheio, novos emails são recusados. Padrão: 10000
+        """
+        self.db_ops = DatabaseOperations(db_name)
+        self.max_processos = max_processos or os.cpu_count()
+        self.max_tentativas = max_tentativas
+        self.janela_tentativas = janela_tentativas
+        self.ttl_email_inexistente = ttl_email_inexistente
+        self.max_emails_cache = max_emails_cache
+
+        self._executor = None
+        self._vagas = threading.BoundedSemaphore(max_pendentes or 4 * self.max_processos)
+        self._lock = threading.Lock()
+        self._tentativas = OrderedDict()
+        self._emails_inexistentes = OrderedDict()
+
+    def _obter_executor(self):
+        """Retorna o pool de processos, criando-o no primeiro uso.
+
+        Returns:
+            ProcessPoolExecutor: Pool de verificação de senhas
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_processos)
+            return self._executor
+
+    @staticmethod
+    def _chave_tentativas(email):
+        """Normaliza um email para uso como chave do limite de tentativas.
+
+        Args:
+            email (str): Email informado no login
+
+        Returns:
+            str: Email sem espaços nas pontas e em minúsculas
+        """
+        return email.strip().lower()
+
+    def _registrar_tentativa(self, email):
+        """Registra uma tentativa de login e aplica o limite por email.
+
+        Um email só deixa o cache quando todas as suas tentativas saíram da
+        janela. Se o cache estiver cheio de janelas ainda válidas, novas
+        tentativas de emails fora dele são recusadas até que alguma expire,
+        em vez de descartar o histórico de um email ainda limitado.
+
+        Args:
+            email (str): Email informado no login
+
+        Raises:
+            TentativasExcedidasError: Se o email excedeu o limite de tentativas
+                ou se o cache de tentativas estiver cheio
+        """
+        chave = self._chave_tentativas(email)
+        agora = time.monotonic()
+        with self._lock:
+            tentativas = self._tentativas.get(chave)
+            if tentativas is None:
+                # A ordem do cache segue a última tentativa; o primeiro é o mais antigo
+                while self._tentativas:
+                    primeira = next(iter(self._tentativas.values()))
+                    if agora - primeira[-1] < self.janela_tentativas:
+                        break
+                    self._tentativas.popitem(last=False)
+                if len(self._tentativas) >= self.max_emails_cache:
+                    raise TentativasExcedidasError(
+                        "Excesso de tentativas de login no serviço; tente novamente mais tarde"
+                    )
+                tentativas = self._tentativas[chave] = deque()
+
+            while tentativas and agora - tentativas[0] >= self.janela_tentativas:
+                tentativas.popleft()
+
+            if len(tentativas) >= self.max_tentativas:
+                raise TentativasExcedidasError(
+                    "Muitas tentativas de login; tente novamente mais tarde"
+                )
+
+            tentativas.append(agora)
+            self._tentativas.move_to_end(chave)
+
+    def _email_inexistente(self, email):
+        """Consulta o cache de emails desconhecidos.
+
+        Args:
+            email (str): Email informado no login
+
+        Returns:
+            bool: True se o email está em cache como inexistente
+        """
+        with self._lock:
+            expira = self._emails_inexistentes.get(email)
+            if expira is None:
+                return False
+            if expira <= time.monotonic():
+                del self._emails_inexistentes[email]
+                return False
+            return True
+
+    def _cachear_email_inexistente(self, email):
+        """Registra um email desconhecido no cache.
+
+        Args:
+            email (str): Email informado no login
+        """
+        with self._lock:
+            self._emails_inexistentes[email] = time.monotonic() + self.ttl_email_inexistente
+            self._emails_inexistentes.move_to_end(email)
+            while len(self._emails_inexistentes) > self.max_emails_cache:
+                self._emails_inexistentes.popitem(last=False)
+
+    def esquecer_email(self, email):
+        """Remove um email dos caches; deve ser chamado após cadastrar o usuário.
+
+        Args:
+            email (str): Email do usuário
+        """
+        with self._lock:
+            self._emails_inexistentes.pop(email, None)
+            self._tentativas.pop(self._chave_tentativas(email), None)
+
+    def autenticar_async(self, email, senha, timeout_fila=5.0):
+        """Inicia a autenticação de um usuário sem aguardar a verificação da senha.
+
+        Args:
+            email (str): Email do usuário
+            senha (str): Senha em texto puro
+            timeout_fila (float, optional): Segundos de espera por uma vaga no pool.
+                Defaults to 5.0.
+
+        Returns:
+            concurrent.futures.Future: Resultado com o dicionário {'id', 'tipo'} do
+                usuário autenticado, ou None se as credenciais forem inválidas
+
+        Raises:
+            TentativasExcedidasError: Se o email excedeu o limite de tentativas
+            RuntimeError: Se o pool estiver sobrecarregado ou ocorrer erro na busca
+        """
+        self._registrar_tentativa(email)
+
+        # Emails desconhecidos ou inativos também passam pelo scrypt
+        usuario = None
+        senha_hash = _HASH_FICTICIO
+        if not self._email_inexistente(email):
+            credenciais = self.db_ops.buscar_credenciais_por_email(email)
+            if credenciais is None:
+                self._cachear_email_inexistente(email)
+            else:
+                usuario_id, hash_usuario, tipo, ativo = credenciais
+                if ativo:
+                    usuario = {'id': usuario_id, 'tipo': tipo}
+                    senha_hash = hash_usuario
+
+        if not self._vagas.acquire(timeout=timeout_fila):
+            raise RuntimeError("Serviço de autenticação sobrecarregado")
+
+        try:
+            verificacao = self._obter_executor().submit(verificar_senha, senha, senha_hash)
+        except BaseException:
+            self._vagas.release()
+            raise
+
+        resultado = Future()
+
+        def concluir(futuro):
+            self._vagas.release()
+            try:
+                valida = futuro.result()
+            except Exception as exc:
+                resultado.set_exception(
+                    RuntimeError(f"Erro ao verificar senha: {exc}")
+                )
+                return
+
+            if valida and usuario is not None:
+                with self._lock:
+                    self._tentativas.pop(self._chave_tentativas(email), None)
+                resultado.set_result(usuario)
+            else:
+                resultado.set_result(None)
+
+        verificacao.add_done_callback(concluir)
+        return resultado
+
+    def autenticar(self, email, senha, timeout=None):
+        """Autentica um usuário, aguardando a verificação da senha.
+
+        Args:
+            email (str): Email do usuário
+            senha (str): Senha em texto puro
+            timeout (float, optional): Segundos máximos de espera. Defaults to None.
+
+        Returns:
+            dict: {'id', 'tipo'} do usuário autenticado ou None se as credenciais
+                forem inválidas
+
+        Raises:
+            TentativasExcedidasError: Se o email excedeu o limite de tentativas
+            RuntimeError: Se ocorrer erro na autenticação
+        """
+        return self.autenticar_async(email, senha).result(timeout)
+
+    def close(self):
+        """Encerra o pool de processos de verificação."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown()
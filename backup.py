@@ -0,0 +1,331 @@
+"""
+Módulo para backup online e restauração do banco de dados do sistema de feira livre.
+"""
+
+import argparse
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+
+class _BackupReiniciado(Exception):
+    """Sinaliza que a cópia incremental foi reiniciada vezes demais."""
+
+
+class BackupManager:
+    """Classe para criar, verificar, rotacionar e restaurar snapshots do banco."""
+
+    def __init__(self, db_name='feira_livre.db', diretorio='backups', manter=7,
+                 paginas_por_lote=256, pausa=0.005, max_reinicios=5, timeout=30.0):
+        """Inicializa o gerenciador de backups.
+
+        Args:
+            db_name (str): Nome do arquivo do banco de dados. Padrão: 'feira_livre.db'
+            diretorio (str): Diretório onde os snapshots são gravados. Padrão: 'backups'
+            manter (int): Quantidade de snapshots mantidos na rotação. Padrão: 7
+            paginas_por_lote (int): Páginas copiadas a cada passo do backup. Padrão: 256
+            pausa (float): Segundos de espera entre os lotes. Padrão: 0.005
+            max_reinicios (int): Reinícios tolerados antes de copiar o restante
+                em um único passo. Padrão: 5
+            timeout (float): Segundos de espera por bloqueios do banco. Padrão: 30.0
+        """
+        self.db_name = db_name
+        self.diretorio = diretorio
+        self.manter = manter
+        self.paginas_por_lote = paginas_por_lote
+        self.pausa = pausa
+        self.max_reinicios = max_reinicios
+        self.timeout = timeout
+
+    def _nome_base(self):
+        """Retorna o nome base dos snapshots deste banco.
+
+        Returns:
+            str: Nome do arquivo do banco, sem diretório e sem extensão
+        """
+        return os.path.splitext(os.path.basename(self.db_name))[0]
+
+    def _padrao_snapshot(self):
+        """Retorna a expressão que reconhece os nomes de snapshot deste banco.
+
+        O carimbo de data e hora faz parte do padrão, de modo que snapshots de
+        um banco cujo nome começa com o deste (por exemplo, 'feira_livre-teste.db'
+        para 'feira_livre.db') não são confundidos com os deste banco.
+
+        Returns:
+            re.Pattern: Padrão '<nome base>-AAAAMMDD-HHMMSS-ffffff.db[.gz]'
+        """
+        return re.compile(re.escape(self._nome_base()) + r'-\d{8}-\d{6}-\d{6}\.db(\.gz)?')
+
+    def _copiar(self, origem, destino):
+        """Copia o banco de origem para o destino em lotes de páginas.
+
+        Em modo WAL, uma transação de leitura é mantida aberta na origem durante
+        toda a cópia, o que produz um snapshot consistente sem bloquear as
+        escritas. Nos demais modos de journal, cada escrita de outra conexão
+        reinicia a cópia; após ``max_reinicios`` reinícios o restante é copiado
+        em um único passo, bloqueando as escritas apenas durante essa etapa.
+
+        Args:
+            origem (sqlite3.Connection): Conexão com o banco a ser copiado
+            destino (sqlite3.Connection): Conexão com o arquivo de destino
+        """
+        modo = origem.execute('PRAGMA journal_mode').fetchone()[0]
+        fixar_snapshot = modo.lower() == 'wal'
+        if fixar_snapshot:
+            origem.execute('BEGIN')
+            origem.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+
+        estado = {'restantes': None, 'reinicios': 0}
+
+        def progresso(_status, restantes, _total):
+            anterior = estado['restantes']
+            if anterior is not None and restantes > anterior:
+                estado['reinicios'] += 1
+                if estado['reinicios'] > self.max_reinicios:
+                    raise _BackupReiniciado()
+            estado['restantes'] = restantes
+            if restantes:
+                time.sleep(self.pausa)
+
+        try:
+            origem.backup(destino, pages=self.paginas_por_lote,
+                          progress=progresso, sleep=self.pausa)
+        except _BackupReiniciado:
+            origem.backup(destino, sleep=self.pausa)
+        finally:
+            if fixar_snapshot:
+                origem.rollback()
+
+    @staticmethod
+    def _verificar_integridade(caminho):
+        """Executa PRAGMA integrity_check em um arquivo de banco não comprimido.
+
+        Args:
+            caminho (str): Caminho do arquivo de banco
+
+        Raises:
+            RuntimeError: Se a verificação de integridade falhar
+        """
+        conn = sqlite3.connect(caminho)
+        try:
+            resultado = conn.execute('PRAGMA integrity_check').fetchall()
+        finally:
+            conn.close()
+
+        if resultado != [('ok',)]:
+            detalhes = '; '.join(linha[0] for linha in resultado[:5])
+            raise RuntimeError(f"Falha na verificação de integridade de {caminho}: {detalhes}")
+
+    def criar_backup(self, comprimir=True):
+        """Cria um snapshot consistente do banco sem interromper as escritas.
+
+        A cópia é gravada em um arquivo temporário, verificada com
+        integrity_check, opcionalmente comprimida com gzip e só então recebe
+        o nome definitivo. Ao final, os snapshots excedentes são removidos.
+
+        Args:
+            comprimir (bool): Se True, grava o snapshot comprimido (.db.gz). Padrão: True
+
+        Returns:
+            str: Caminho do snapshot criado
+
+        Raises:
+            RuntimeError: Se ocorrer erro durante o backup ou a verificação
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        carimbo = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        base = os.path.join(self.diretorio, f"{self._nome_base()}-{carimbo}.db")
+        temporario = base + '.tmp'
+        final = base + '.gz' if comprimir else base
+
+        try:
+            origem = sqlite3.connect(self.db_name, timeout=self.timeout)
+            destino = sqlite3.connect(temporario)
+            try:
+                self._copiar(origem, destino)
+            finally:
+                destino.close()
+                origem.close()
+
+            self._verificar_integridade(temporario)
+
+            if comprimir:
+                with open(temporario, 'rb') as entrada, gzip.open(final + '.tmp', 'wb') as saida:
+                    shutil.copyfileobj(entrada, saida)
+                os.remove(temporario)
+                os.replace(final + '.tmp', final)
+            else:
+                os.replace(temporario, final)
+        except (sqlite3.Error, OSError) as exc:
+            raise RuntimeError(f"Erro ao criar backup: {exc}") from exc
+        finally:
+            for resto in (temporario, final + '.tmp'):
+                if os.path.exists(resto):
+                    os.remove(resto)
+
+        self.rotacionar()
+        return final
+
+    def listar_snapshots(self):
+        """Lista os snapshots deste banco, do mais antigo para o mais recente.
+
+        Returns:
+            list: Caminhos dos snapshots encontrados
+        """
+        if not os.path.isdir(self.diretorio):
+            return []
+
+        padrao = self._padrao_snapshot()
+        nomes = sorted(
+            nome for nome in os.listdir(self.diretorio) if padrao.fullmatch(nome)
+        )
+        return [os.path.join(self.diretorio, nome) for nome in nomes]
+
+    def rotacionar(self):
+        """Remove os snapshots mais antigos, mantendo apenas os ``manter`` mais recentes.
+
+        Returns:
+            list: Caminhos dos snapshots removidos
+        """
+        snapshots = self.listar_snapshots()
+        removidos = snapshots[:-self.manter] if self.manter > 0 else snapshots
+        for caminho in removidos:
+            os.remove(caminho)
+        return removidos
+
+    def restaurar(self, snapshot, destino=None):
+        """Restaura um snapshot sobre o banco de destino.
+
+        O snapshot é descomprimido para um arquivo temporário, verificado e
+        copiado para o destino pela API de backup do SQLite, que mantém o
+        arquivo de destino consistente mesmo com outras conexões abertas.
+
+        Args:
+            snapshot (str): Caminho do snapshot (.db ou .db.gz)
+            destino (str, optional): Banco a ser sobrescrito. Padrão: o banco deste gerenciador
+
+        Returns:
+            str: Caminho do banco restaurado
+
+        Raises:
+            RuntimeError: Se o snapshot for inválido ou ocorrer erro na restauração
+        """
+        destino = destino or self.db_name
+        temporario = f"{destino}.restore.tmp"
+
+        try:
+            if snapshot.endswith('.gz'):
+                with gzip.open(snapshot, 'rb') as entrada, open(temporario, 'wb') as saida:
+                    shutil.copyfileobj(entrada, saida)
+            else:
+                shutil.copyfile(snapshot, temporario)
+
+            self._verificar_integridade(temporario)
+
+            origem = sqlite3.connect(temporario)
+            alvo = sqlite3.connect(destino, timeout=self.timeout)
+            try:
+                origem.backup(alvo)
+            finally:
+                alvo.close()
+                origem.close()
+        except (sqlite3.Error, OSError) as exc:
+            raise RuntimeError(f"Erro ao restaurar backup: {exc}") from exc
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+        return destino
+
+
+def _parse_args(argv):
+    """Interpreta os argumentos de linha de comando.
+
+    Args:
+        argv (list): Argumentos de linha de comando (sem o nome do programa)
+
+    Returns:
+        argparse.Namespace: Argumentos interpretados
+    """
+    parser = argparse.ArgumentParser(
+        description='Backup online e restauração do banco de dados da feira livre.'
+    )
+    parser.add_argument(
+        '--banco', default='feira_livre.db',
+        help="arquivo do banco de dados (padrão: 'feira_livre.db')"
+    )
+    parser.add_argument(
+        '--diretorio', default='backups',
+        help="diretório dos snapshots (padrão: 'backups')"
+    )
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    criar = comandos.add_parser('backup', help='cria um novo snapshot')
+    criar.add_argument('--manter', type=int, default=7,
+                       help='quantidade de snapshots mantidos (padrão: 7)')
+    criar.add_argument('--paginas', type=int, default=256,
+                       help='páginas copiadas por lote (padrão: 256)')
+    criar.add_argument('--pausa', type=float, default=0.005,
+                       help='segundos de pausa entre lotes (padrão: 0.005)')
+    criar.add_argument('--sem-compressao', action='store_true',
+                       help='grava o snapshot sem gzip')
+
+    restaurar = comandos.add_parser('restaurar', help='restaura um snapshot')
+    restaurar.add_argument('snapshot', nargs='?',
+                           help='snapshot a restaurar (padrão: o mais recente)')
+
+    comandos.add_parser('listar', help='lista os snapshots existentes')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Função principal da ferramenta de backup.
+
+    Args:
+        argv (list, optional): Argumentos de linha de comando. Padrão: sys.argv[1:]
+
+    Returns:
+        int: Código de saída (0 em caso de sucesso)
+    """
+    args = _parse_args(argv)
+
+    if args.comando == 'backup':
+        manager = BackupManager(args.banco, args.diretorio, manter=args.manter,
+                                paginas_por_lote=args.paginas, pausa=args.pausa)
+    else:
+        manager = BackupManager(args.banco, args.diretorio)
+
+    try:
+        if args.comando == 'backup':
+            inicio = time.perf_counter()
+            caminho = manager.criar_backup(comprimir=not args.sem_compressao)
+            print(f"Backup criado em {caminho} ({time.perf_counter() - inicio:.2f}s)")
+        elif args.comando == 'restaurar':
+            snapshot = args.snapshot
+            if snapshot is None:
+                snapshots = manager.listar_snapshots()
+                if not snapshots:
+                    print("Nenhum snapshot encontrado", file=sys.stderr)
+                    return 1
+                snapshot = snapshots[-1]
+            manager.restaurar(snapshot)
+            print(f"Banco {args.banco} restaurado a partir de {snapshot}")
+        else:
+            for caminho in manager.listar_snapshots():
+                print(f"{caminho}\t{os.path.getsize(caminho)} bytes")
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
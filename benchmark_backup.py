@@ -0,0 +1,169 @@
+"""
+Benchmark do impacto do backup online na latência das operações do banco.
+
+Mede as latências (p50, p99 e máxima) de chamadas de DatabaseOperations
+enquanto um backup é executado em paralelo, comparando a cópia em passo
+único com a cópia incremental em lotes de páginas.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from backup import BackupManager
+from create_database import bootstrap
+from database_operations import DatabaseOperations
+from money import para_centavos
+
+
+def popular_banco(db_name, total_produtos):
+    """Popula o banco com usuários, um feirante e produtos sintéticos.
+
+    Args:
+        db_name (str): Nome do arquivo do banco de dados
+        total_produtos (int): Quantidade de produtos a inserir
+
+    Returns:
+        tuple: (lista de emails, lista de IDs de produtos)
+    """
+    bootstrap(db_name, dados_exemplo=True)
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+
+    emails = [f'usuario{i}@exemplo.com' for i in range(200)]
+    cursor.executemany(
+        'INSERT INTO usuarios (email, senha_hash, nome, tipo) VALUES (?, ?, ?, ?)',
+        [(email, 'hash', f'Usuário {i}', 'cliente') for i, email in enumerate(emails)]
+    )
+    cursor.execute(
+        'INSERT INTO feirantes (usuario_id, nome_estabelecimento) VALUES (1, ?)',
+        ('Banca de teste',)
+    )
+    feirante_id = cursor.lastrowid
+    cursor.executemany(
+        '''INSERT INTO produtos (feirante_id, nome, descricao, preco, categoria_id)
+        VALUES (?, ?, ?, ?, 1)''',
+        [(feirante_id, f'Produto {i}', 'x' * 400, para_centavos(1 + i % 50))
+         for i in range(total_produtos)]
+    )
+    conn.commit()
+    produtos = [linha[0] for linha in cursor.execute('SELECT id FROM produtos LIMIT 500')]
+    conn.close()
+    return emails, produtos
+
+
+def medir_latencias(db_ops, emails, produtos, parar):
+    """Executa operações de leitura e escrita até o evento ``parar`` ser sinalizado.
+
+    Args:
+        db_ops (DatabaseOperations): Operações do banco de dados
+        emails (list): Emails existentes para as buscas
+        produtos (list): IDs de produtos para os carrinhos
+        parar (threading.Event): Evento que encerra a medição
+
+    Returns:
+        list: Latências das chamadas, em segundos
+    """
+    latencias = []
+    i = 0
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        if i % 4 == 0:
+            db_ops.adicionar_ao_carrinho(1 + i % len(emails), produtos[i % len(produtos)], 1)
+        else:
+            db_ops.buscar_usuario_por_email(emails[i % len(emails)])
+        latencias.append(time.perf_counter() - inicio)
+        i += 1
+        time.sleep(0.001)
+    return latencias
+
+
+def percentil(valores, p):
+    """Calcula o percentil ``p`` de uma lista de valores.
+
+    Args:
+        valores (list): Valores medidos
+        p (float): Percentil entre 0 e 100
+
+    Returns:
+        float: Valor do percentil
+    """
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def executar_cenario(nome, db_name, emails, produtos, manager, duracao):
+    """Mede as latências durante ``duracao`` segundos, com ou sem backups em laço.
+
+    Args:
+        nome (str): Nome do cenário
+        db_name (str): Nome do arquivo do banco de dados
+        emails (list): Emails existentes para as buscas
+        produtos (list): IDs de produtos para os carrinhos
+        manager (BackupManager): Gerenciador de backups ou None para o cenário base
+        duracao (float): Duração da medição em segundos
+    """
+    parar = threading.Event()
+    backups = []
+
+    def executar_backups():
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            manager.criar_backup(comprimir=False)
+            backups.append(time.perf_counter() - inicio)
+
+    if manager:
+        thread = threading.Thread(target=executar_backups)
+        thread.start()
+    timer = threading.Timer(duracao, parar.set)
+    timer.start()
+    latencias = medir_latencias(DatabaseOperations(db_name), emails, produtos, parar)
+    if manager:
+        thread.join()
+
+    duracao_backup = f"{sum(backups) / len(backups):.3f}s" if backups else '-'
+    print(f"{nome:<28} chamadas={len(latencias):>6} "
+          f"p50={percentil(latencias, 50) * 1000:7.2f}ms "
+          f"p99={percentil(latencias, 99) * 1000:7.2f}ms "
+          f"max={max(latencias) * 1000:8.2f}ms "
+          f"backups={len(backups):>3} duração média={duracao_backup}")
+
+
+def main():
+    """Executa o benchmark nos modos de journal padrão e WAL."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--produtos', type=int, default=50000,
+                        help='quantidade de produtos sintéticos (padrão: 50000)')
+    parser.add_argument('--duracao', type=float, default=5.0,
+                        help='segundos de medição por cenário (padrão: 5)')
+    args = parser.parse_args()
+
+    for modo in ('delete', 'wal'):
+        with tempfile.TemporaryDirectory() as diretorio:
+            db_name = os.path.join(diretorio, 'bench.db')
+            emails, produtos = popular_banco(db_name, args.produtos)
+            conn = sqlite3.connect(db_name)
+            conn.execute(f'PRAGMA journal_mode = {modo}')
+            conn.close()
+
+            tamanho = os.path.getsize(db_name) / 1024 / 1024
+            print(f"\njournal_mode={modo}, banco de {tamanho:.1f} MB")
+            destino = os.path.join(diretorio, 'backups')
+            cenarios = [
+                ('sem backup', None),
+                ('backup em passo único', BackupManager(
+                    db_name, destino, manter=1, paginas_por_lote=-1)),
+                ('backup incremental (256)', BackupManager(
+                    db_name, destino, manter=1, paginas_por_lote=256, pausa=0.005)),
+                ('backup incremental (64)', BackupManager(
+                    db_name, destino, manter=1, paginas_por_lote=64, pausa=0.005)),
+            ]
+            for nome, manager in cenarios:
+                executar_cenario(nome, db_name, emails, produtos, manager, args.duracao)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark da vazão de logins do Autenticador por núcleo de CPU.
+
+Cria usuários com senhas em scrypt e dispara logins assíncronos variando o
+número de processos de verificação, reportando logins por segundo no total
+e por processo.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from authentication import Autenticador, gerar_hash_senha
+from create_database import bootstrap
+
+
+def popular_usuarios(db_name, total):
+    """Cria usuários cuja senha é igual ao próprio email.
+
+    Args:
+        db_name (str): Nome do arquivo do banco de dados
+        total (int): Quantidade de usuários
+
+    Returns:
+        list: Emails criados
+    """
+    bootstrap(db_name)
+    emails = [f'usuario{i}@exemplo.com' for i in range(total)]
+    with ProcessPoolExecutor() as executor:
+        hashes = list(executor.map(gerar_hash_senha, emails))
+
+    conn = sqlite3.connect(db_name)
+    conn.executemany(
+        'INSERT INTO usuarios (email, senha_hash, nome, tipo) VALUES (?, ?, ?, ?)',
+        [(email, senha_hash, email, 'cliente') for email, senha_hash in zip(emails, hashes)]
+    )
+    conn.commit()
+    conn.close()
+    return emails
+
+
+def medir(db_name, emails, processos, total_logins):
+    """Mede a vazão de logins com ``processos`` processos de verificação.
+
+    Args:
+        db_name (str): Nome do arquivo do banco de dados
+        emails (list): Emails existentes
+        processos (int): Processos do pool de verificação
+        total_logins (int): Quantidade de logins disparados
+
+    Returns:
+        float: Logins por segundo
+    """
+    autenticador = Autenticador(db_name, max_processos=processos,
+                                max_pendentes=total_logins,
+                                max_tentativas=total_logins)
+    # Aquece o pool para não medir a criação dos processos
+    autenticador.autenticar(emails[0], emails[0])
+
+    inicio = time.perf_counter()
+    futuros = [
+        autenticador.autenticar_async(emails[i % len(emails)], emails[i % len(emails)])
+        for i in range(total_logins)
+    ]
+    falhas = sum(1 for futuro in futuros if futuro.result() is None)
+    duracao = time.perf_counter() - inicio
+    autenticador.close()
+
+    if falhas:
+        print(f"  aviso: {falhas} login(s) falharam")
+    return total_logins / duracao
+
+
+def main():
+    """Executa o benchmark para 1 até os.cpu_count() processos."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=100,
+                        help='usuários cadastrados (padrão: 100)')
+    parser.add_argument('--logins', type=int, default=200,
+                        help='logins por configuração (padrão: 200)')
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count()
+    configuracoes = sorted({1, 2, 4, 8, nucleos} & set(range(1, nucleos + 1)))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_name = os.path.join(diretorio, 'bench.db')
+        emails = popular_usuarios(db_name, args.usuarios)
+        print(f"{nucleos} núcleo(s) disponível(is)")
+        for processos in configuracoes:
+            vazao = medir(db_name, emails, processos, args.logins)
+            print(f"processos={processos:<3} logins/s={vazao:8.1f} "
+                  f"logins/s por processo={vazao / processos:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
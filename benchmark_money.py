@@ -0,0 +1,130 @@
+"""
+Benchmark da agregação de valores monetários: REAL com Decimal versus centavos inteiros.
+
+Compara três formas de somar as vendas por feirante:
+
+- REAL somado pelo SQLite (rápido, mas sujeito a erro de ponto flutuante)
+- REAL lido e convertido para Decimal em Python (exato, mas lento)
+- centavos inteiros somados pelo SQLite (exato e executado no banco)
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+from decimal import Decimal
+
+from money import de_centavos
+
+
+def criar_banco(total_pedidos, total_feirantes):
+    """Cria em memória as tabelas de pedidos nos dois formatos, com os mesmos valores.
+
+    Args:
+        total_pedidos (int): Quantidade de pedidos
+        total_feirantes (int): Quantidade de feirantes
+
+    Returns:
+        sqlite3.Connection: Conexão com o banco em memória
+    """
+    rng = random.Random(42)
+    pedidos = [
+        (rng.randrange(1, total_feirantes + 1), rng.randrange(50, 50000))
+        for _ in range(total_pedidos)
+    ]
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE pedidos_real (feirante_id INTEGER, valor_total REAL)')
+    conn.execute('CREATE TABLE pedidos_centavos (feirante_id INTEGER, valor_total INTEGER)')
+    conn.executemany(
+        'INSERT INTO pedidos_real VALUES (?, ?)',
+        [(feirante, centavos / 100) for feirante, centavos in pedidos]
+    )
+    conn.executemany('INSERT INTO pedidos_centavos VALUES (?, ?)', pedidos)
+    conn.commit()
+    return conn
+
+
+def somar_real_sqlite(conn):
+    """Soma os valores REAL por feirante no SQLite.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco
+
+    Returns:
+        dict: Total por feirante (Decimal a partir do float somado)
+    """
+    return {
+        feirante: Decimal(repr(total))
+        for feirante, total in conn.execute(
+            'SELECT feirante_id, SUM(valor_total) FROM pedidos_real GROUP BY feirante_id'
+        )
+    }
+
+
+def somar_real_decimal(conn):
+    """Lê os valores REAL e os soma como Decimal em Python.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco
+
+    Returns:
+        dict: Total por feirante
+    """
+    totais = {}
+    for feirante, valor in conn.execute('SELECT feirante_id, valor_total FROM pedidos_real'):
+        totais[feirante] = totais.get(feirante, Decimal(0)) + Decimal(repr(valor))
+    return totais
+
+
+def somar_centavos_sqlite(conn):
+    """Soma os centavos inteiros por feirante no SQLite.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco
+
+    Returns:
+        dict: Total por feirante
+    """
+    return {
+        feirante: de_centavos(total)
+        for feirante, total in conn.execute(
+            'SELECT feirante_id, SUM(valor_total) FROM pedidos_centavos GROUP BY feirante_id'
+        )
+    }
+
+
+def main():
+    """Executa o benchmark e compara os resultados com a soma exata."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pedidos', type=int, default=500000,
+                        help='quantidade de pedidos (padrão: 500000)')
+    parser.add_argument('--feirantes', type=int, default=100,
+                        help='quantidade de feirantes (padrão: 100)')
+    parser.add_argument('--repeticoes', type=int, default=5,
+                        help='repetições de cada estratégia (padrão: 5)')
+    args = parser.parse_args()
+
+    conn = criar_banco(args.pedidos, args.feirantes)
+    exato = somar_centavos_sqlite(conn)
+
+    estrategias = [
+        ('REAL + SUM no SQLite', somar_real_sqlite),
+        ('REAL + Decimal em Python', somar_real_decimal),
+        ('centavos + SUM no SQLite', somar_centavos_sqlite),
+    ]
+    for nome, estrategia in estrategias:
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            totais = estrategia(conn)
+        duracao = (time.perf_counter() - inicio) / args.repeticoes
+
+        divergentes = sum(1 for feirante, total in totais.items() if total != exato[feirante])
+        print(f"{nome:<26} {duracao * 1000:9.2f} ms/consulta "
+              f"totais divergentes={divergentes}/{len(exato)}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
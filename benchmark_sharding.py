@@ -0,0 +1,134 @@
+"""
+Benchmark da vazão de escrita em carrinhos conforme o número de shards aumenta.
+
+Para cada configuração, as regiões são faixas de longitude de mesma largura e
+vários processos adicionam itens a carrinhos de produtos aleatórios durante um
+intervalo fixo. Com um único shard todos os processos disputam o mesmo
+escritor; com mais shards as escritas se distribuem entre arquivos.
+"""
+
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+
+from sharding import ShardedDatabaseOperations, ShardRouter
+
+LAT_MIN, LAT_MAX = -25.0, -20.0
+LON_MIN, LON_MAX = -50.0, -40.0
+
+
+def criar_router(total_shards, diretorio):
+    """Cria um roteador com ``total_shards`` faixas de longitude.
+
+    Args:
+        total_shards (int): Quantidade de shards regionais
+        diretorio (str): Diretório dos arquivos de shard
+
+    Returns:
+        ShardRouter: Roteador configurado
+    """
+    largura = (LON_MAX - LON_MIN) / total_shards
+    regioes = [
+        {'nome': f'faixa{i}', 'lat_min': LAT_MIN, 'lat_max': LAT_MAX,
+         'lon_min': LON_MIN + i * largura, 'lon_max': LON_MIN + (i + 1) * largura}
+        for i in range(total_shards)
+    ]
+    return ShardRouter(regioes, diretorio)
+
+
+def popular(sharded, total_feirantes, produtos_por_feirante, total_clientes):
+    """Cria feirantes espalhados pela área, seus produtos e clientes.
+
+    Args:
+        sharded (ShardedDatabaseOperations): Operações particionadas
+        total_feirantes (int): Quantidade de feirantes
+        produtos_por_feirante (int): Produtos de cada feirante
+        total_clientes (int): Quantidade de clientes
+
+    Returns:
+        tuple: (IDs dos clientes, IDs dos produtos)
+    """
+    rng = random.Random(42)
+    produtos = []
+    for i in range(total_feirantes):
+        usuario_id = sharded.criar_usuario({
+            'email': f'feirante{i}@exemplo.com', 'senha_hash': 'hash',
+            'nome': f'Feirante {i}', 'tipo': 'feirante',
+            'latitude': rng.uniform(LAT_MIN, LAT_MAX),
+            'longitude': LON_MIN + (i + 0.5) * (LON_MAX - LON_MIN) / total_feirantes,
+        })
+        feirante_id = sharded.criar_feirante({
+            'usuario_id': usuario_id, 'nome_estabelecimento': f'Banca {i}'
+        })
+        for j in range(produtos_por_feirante):
+            produtos.append(sharded.criar_produto({
+                'feirante_id': feirante_id, 'nome': f'Produto {i}-{j}',
+                'preco': 1.0 + j, 'categoria_id': 1, 'quantidade_estoque': 100,
+            }))
+
+    clientes = [
+        sharded.criar_usuario({
+            'email': f'cliente{i}@exemplo.com', 'senha_hash': 'hash',
+            'nome': f'Cliente {i}', 'tipo': 'cliente',
+        })
+        for i in range(total_clientes)
+    ]
+    return clientes, produtos
+
+
+def trabalhador(args):
+    """Adiciona itens a carrinhos até o fim do intervalo.
+
+    Args:
+        args (tuple): (total de shards, diretório, clientes, produtos, duração, semente)
+
+    Returns:
+        tuple: (escritas concluídas, escritas com erro)
+    """
+    total_shards, diretorio, clientes, produtos, duracao, semente = args
+    sharded = ShardedDatabaseOperations(criar_router(total_shards, diretorio))
+    rng = random.Random(semente)
+    concluidas = erros = 0
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        try:
+            sharded.adicionar_ao_carrinho(rng.choice(clientes), rng.choice(produtos), 1)
+            concluidas += 1
+        except RuntimeError:
+            erros += 1
+    return concluidas, erros
+
+
+def main():
+    """Executa o benchmark para 1, 2, 4 e 8 shards."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processos', type=int, default=8,
+                        help='processos escritores (padrão: 8)')
+    parser.add_argument('--duracao', type=float, default=5.0,
+                        help='segundos de medição por configuração (padrão: 5)')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='quantidades de shards avaliadas (padrão: 1 2 4 8)')
+    args = parser.parse_args()
+
+    for total_shards in args.shards:
+        with tempfile.TemporaryDirectory() as diretorio:
+            sharded = ShardedDatabaseOperations(criar_router(total_shards, diretorio))
+            clientes, produtos = popular(sharded, 16, 20, 200)
+
+            tarefas = [
+                (total_shards, diretorio, clientes, produtos, args.duracao, semente)
+                for semente in range(args.processos)
+            ]
+            with multiprocessing.Pool(args.processos) as pool:
+                resultados = pool.map(trabalhador, tarefas)
+
+            concluidas = sum(r[0] for r in resultados)
+            erros = sum(r[1] for r in resultados)
+            print(f"shards={total_shards:<3} processos={args.processos:<3} "
+                  f"escritas/s={concluidas / args.duracao:9.1f} erros={erros}")
+
+
+if __name__ == "__main__":
+    main()
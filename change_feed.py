@@ -0,0 +1,254 @@
+"""
+Módulo para leitura do feed de alterações (change data capture) do sistema de feira livre.
+
+Gatilhos em produtos, pedidos e itens_carrinho registram cada mudança na
+tabela ``alteracoes`` com uma sequência monotônica. Consumidores leem as
+alterações posteriores à última sequência processada, em lotes, em vez de
+reler as tabelas inteiras.
+"""
+
+from database_operations import DatabaseOperations
+
+
+class ChangeFeed:
+    """Classe para consumir o feed de alterações do banco de dados.
+
+    Cada alteração é uma tupla ``(seq, tabela, operacao, registro_id,
+    referencia_id, valor_anterior, valor_novo, data_alteracao)``, onde:
+
+    - produtos: valores são ``quantidade_estoque`` e a referência é ``feirante_id``
+    - pedidos: valores são ``status`` e a referência é ``feirante_id``
+    - itens_carrinho: valores são ``quantidade`` e a referência é ``produto_id``
+    """
+
+    def __init__(self, db_name='feira_livre.db'):
+        """Inicializa o leitor do feed de alterações.
+
+        Args:
+            db_name (str): Nome do arquivo do banco de dados. Padrão: 'feira_livre.db'
+        """
+        self.db_ops = DatabaseOperations(db_name)
+
+    def ler_alteracoes(self, apos_seq=0, limite=500, tabelas=None):
+        """Lê um lote de alterações posteriores a uma sequência.
+
+        Args:
+            apos_seq (int, optional): Última sequência já processada. Defaults to 0.
+            limite (int, optional): Quantidade máxima de alterações. Defaults to 500.
+            tabelas (list, optional): Tabelas de interesse. Defaults to None (todas).
+
+        Returns:
+            list: Alterações em ordem crescente de sequência
+
+        Raises:
+            RuntimeError: Se ocorrer erro na leitura
+        """
+        try:
+            conn = self.db_ops.get_connection()
+            cursor = conn.cursor()
+
+            query = '''
+            SELECT seq, tabela, operacao, registro_id, referencia_id,
+                   valor_anterior, valor_novo, data_alteracao
+            FROM alteracoes
+            WHERE seq > ?
+            '''
+            params = [apos_seq]
+
+            if tabelas:
+                query += f" AND tabela IN ({', '.join('?' * len(tabelas))})"
+                params.extend(tabelas)
+
+            query += ' ORDER BY seq LIMIT ?'
+            params.append(limite)
+
+            cursor.execute(query, params)
+            alteracoes = cursor.fetchall()
+            conn.close()
+
+            return alteracoes
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao ler alterações: {exc}") from exc
+
+    def iterar_alteracoes(self, apos_seq=0, tamanho_lote=500, tabelas=None):
+        """Percorre todas as alterações posteriores a uma sequência, lote a lote.
+
+        Args:
+            apos_seq (int, optional): Última sequência já processada. Defaults to 0.
+            tamanho_lote (int, optional): Alterações lidas por consulta. Defaults to 500.
+            tabelas (list, optional): Tabelas de interesse. Defaults to None (todas).
+
+        Yields:
+            tuple: Cada alteração, em ordem crescente de sequência
+        """
+        while True:
+            lote = self.ler_alteracoes(apos_seq, tamanho_lote, tabelas)
+            yield from lote
+            if len(lote) < tamanho_lote:
+                return
+            apos_seq = lote[-1][0]
+
+    def ultimo_seq(self):
+        """Retorna a sequência da alteração mais recente.
+
+        Returns:
+            int: Última sequência registrada (0 se não houver alterações)
+
+        Raises:
+            RuntimeError: Se ocorrer erro na consulta
+        """
+        try:
+            conn = self.db_ops.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM alteracoes')
+            seq = cursor.fetchone()[0]
+            conn.close()
+            return seq
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao consultar alterações: {exc}") from exc
+
+    def posicao(self, consumidor):
+        """Retorna a última sequência confirmada por um consumidor.
+
+        Args:
+            consumidor (str): Nome do consumidor
+
+        Returns:
+            int: Última sequência confirmada (0 se o consumidor for novo)
+
+        Raises:
+            RuntimeError: Se ocorrer erro na consulta
+        """
+        try:
+            conn = self.db_ops.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT ultimo_seq FROM consumidores_alteracoes WHERE nome = ?',
+                (consumidor,)
+            )
+            linha = cursor.fetchone()
+            conn.close()
+            return linha[0] if linha else 0
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao consultar consumidor: {exc}") from exc
+
+    def confirmar(self, consumidor, seq):
+        """Registra que um consumidor processou as alterações até ``seq``.
+
+        Args:
+            consumidor (str): Nome do consumidor
+            seq (int): Última sequência processada
+
+        Returns:
+            bool: True se a operação foi bem sucedida
+
+        Raises:
+            RuntimeError: Se ocorrer erro ao registrar a posição
+        """
+        try:
+            conn = self.db_ops.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO consumidores_alteracoes (nome, ultimo_seq) VALUES (?, ?)
+            ON CONFLICT (nome) DO UPDATE SET
+                ultimo_seq = MAX(ultimo_seq, excluded.ultimo_seq),
+                data_atualizacao = CURRENT_TIMESTAMP
+            ''', (consumidor, seq))
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao confirmar alterações: {exc}") from exc
+
+    def podar(self):
+        """Remove as alterações já confirmadas por todos os consumidores.
+
+        Returns:
+            int: Quantidade de alterações removidas
+
+        Raises:
+            RuntimeError: Se ocorrer erro na remoção
+        """
+        try:
+            conn = self.db_ops.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+            DELETE FROM alteracoes
+            WHERE seq <= (SELECT MIN(ultimo_seq) FROM consumidores_alteracoes)
+            ''')
+            removidas = cursor.rowcount
+            conn.commit()
+            conn.close()
+            return removidas
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao podar alterações: {exc}") from exc
+
+
+class AvaliadorEstoqueBaixo:
+    """Classe que gera alertas de estoque baixo a partir do feed de alterações."""
+
+    def __init__(self, feed, limite=10, limites_por_produto=None,
+                 consumidor='alertas_estoque'):
+        """Inicializa o avaliador de estoque baixo.
+
+        Args:
+            feed (ChangeFeed): Feed de alterações
+            limite (int, optional): Estoque mínimo padrão. Defaults to 10.
+            limites_por_produto (dict, optional): Estoque mínimo por ID de produto
+            consumidor (str, optional): Nome usado para registrar a posição no feed
+        """
+        self.feed = feed
+        self.limite = limite
+        self.limites_por_produto = limites_por_produto or {}
+        self.consumidor = consumidor
+
+    def _limite(self, produto_id):
+        """Retorna o estoque mínimo de um produto.
+
+        Args:
+            produto_id (int): ID do produto
+
+        Returns:
+            int: Estoque mínimo
+        """
+        return self.limites_por_produto.get(produto_id, self.limite)
+
+    def avaliar(self, tamanho_lote=500):
+        """Processa as alterações pendentes de produtos e retorna os novos alertas.
+
+        Um alerta é gerado apenas quando o estoque cruza o limite para baixo
+        (ou quando um produto é criado já abaixo dele), de modo que cada queda
+        gera um único alerta até o produto ser reposto.
+
+        Args:
+            tamanho_lote (int, optional): Alterações lidas por consulta. Defaults to 500.
+
+        Returns:
+            list: Dicionários com seq, produto_id, feirante_id, estoque e limite
+
+        Raises:
+            RuntimeError: Se ocorrer erro na leitura do feed
+        """
+        inicio = self.feed.posicao(self.consumidor)
+        ultimo = inicio
+        alertas = []
+
+        for alteracao in self.feed.iterar_alteracoes(inicio, tamanho_lote, ['produtos']):
+            seq, _, operacao, produto_id, feirante_id, anterior, novo, _ = alteracao
+            ultimo = seq
+            if operacao == 'D' or novo is None:
+                continue
+
+            limite = self._limite(produto_id)
+            if novo <= limite and (anterior is None or anterior > limite):
+                alertas.append({
+                    'seq': seq,
+                    'produto_id': produto_id,
+                    'feirante_id': feirante_id,
+                    'estoque': novo,
+                    'limite': limite,
+                })
+
+        if ultimo > inicio:
+            self.feed.confirmar(self.consumidor, ultimo)
+        return alertas
@@ -2,367 +2,558 @@
 Módulo para criação e gerenciamento do banco de dados SQLite para o sistema de feira livre.
 """
 
+import argparse
 import sqlite3
-
-
-class DatabaseManager:
-    """Classe para gerenciar a criação e conexão com o banco de dados SQLite."""
-
-    def __init__(self, db_name='feira_livre.db'):
-        """Inicializa o gerenciador do banco de dados.
-
-        Args:
-            db_name (str): Nome do arquivo do banco de dados. Padrão: 'feira_livre.db'
-        """
-        self.db_name = db_name
-        self.conn = None
-
-    def connect(self):
-        """Conecta ao banco de dados SQLite.
-
-        Returns:
-            bool: True se a conexão foi bem sucedida, False caso contrário
-        """
-        try:
-            self.conn = sqlite3.connect(self.db_name)
-            # Ativa chaves estrangeiras
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            print(f"Conectado ao banco de dados: {self.db_name}")
-            return True
-        except sqlite3.Error as error:
-            print(f"Erro ao conectar ao banco de dados: {error}")
-            return False
-
-    def create_tables(self):
-        """Cria todas as tabelas do banco de dados.
-
-        Returns:
-            bool: True se as tabelas foram criadas com sucesso, False caso contrário
-        """
-        if not self.conn:
-            print("Não há conexão com o banco de dados")
-            return False
-
-        try:
-            cursor = self.conn.cursor()
-
-            # Tabela usuarios
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email VARCHAR(255) NOT NULL UNIQUE,
-                senha_hash VARCHAR(255) NOT NULL,
-                nome VARCHAR(255) NOT NULL,
-                telefone VARCHAR(20),
-                latitude DECIMAL(10,6),
-                longitude DECIMAL(10,6),
-                tipo VARCHAR(50) NOT NULL,
-                ativo BOOLEAN DEFAULT 1,
-                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-
-            # Tabela feirantes
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS feirantes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                usuario_id INTEGER NOT NULL,
-                nome_estabelecimento VARCHAR(255) NOT NULL,
-                descricao TEXT,
-                horario_funcionamento VARCHAR(100),
-                dias_funcionamento VARCHAR(100),
-                avaliacao_media DECIMAL(3,2) DEFAULT 0.0,
-                total_avaliacoes INTEGER DEFAULT 0,
-                ativo BOOLEAN DEFAULT 1,
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE
-            )
-            ''')
-
-            # Tabela categorias
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categorias (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome VARCHAR(255) NOT NULL UNIQUE,
-                descricao TEXT
-            )
-            ''')
-
-            # Tabela produtos
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS produtos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                feirante_id INTEGER NOT NULL,
-                nome VARCHAR(255) NOT NULL,
-                descricao TEXT,
-                preco DECIMAL(10,2) NOT NULL,
-                quantidade_estoque INTEGER DEFAULT 0,
-                categoria_id INTEGER NOT NULL,
-                latitude DECIMAL(10,6),
-                longitude DECIMAL(10,6),
-                avaliacao_media DECIMAL(3,2) DEFAULT 0.0,
-                total_avaliacoes INTEGER DEFAULT 0,
-                ativo BOOLEAN DEFAULT 1,
-                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (feirante_id) REFERENCES feirantes (id) ON DELETE CASCADE,
-                FOREIGN KEY (categoria_id) REFERENCES categorias (id)
-            )
-            ''')
-
-            # Tabela avaliacoes_feirantes
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS avaliacoes_feirantes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                feirante_id INTEGER NOT NULL,
-                usuario_id INTEGER NOT NULL,
-                nota DECIMAL(2,1) NOT NULL CHECK (nota >= 0 AND nota <= 5),
-                comentario TEXT,
-                data_avaliacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (feirante_id) REFERENCES feirantes (id) ON DELETE CASCADE,
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE,
-                UNIQUE(feirante_id, usuario_id)
+import sys
+
+from money import TIPO_CENTAVOS
+
+# Versão do esquema gravada em PRAGMA user_version após a inicialização
+SCHEMA_VERSION = 6
+
+# Definições das tabelas, na ordem de criação (respeitando as chaves estrangeiras)
+TABELAS = [
+    ('usuarios', '''
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        senha_hash VARCHAR(255) NOT NULL,
+        nome VARCHAR(255) NOT NULL,
+        telefone VARCHAR(20),
+        latitude DECIMAL(10,6),
+        longitude DECIMAL(10,6),
+        tipo VARCHAR(50) NOT NULL,
+        ativo BOOLEAN DEFAULT 1,
+        data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    '''),
+    ('feirantes', '''
+    CREATE TABLE IF NOT EXISTS feirantes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL,
+        nome_estabelecimento VARCHAR(255) NOT NULL,
+        descricao TEXT,
+        horario_funcionamento VARCHAR(100),
+        dias_funcionamento VARCHAR(100),
+        avaliacao_media DECIMAL(3,2) DEFAULT 0.0,
+        total_avaliacoes INTEGER DEFAULT 0,
+        ativo BOOLEAN DEFAULT 1,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE
+    )
+    '''),
+    ('categorias', '''
+    CREATE TABLE IF NOT EXISTS categorias (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome VARCHAR(255) NOT NULL UNIQUE,
+        descricao TEXT
+    )
+    '''),
+    ('produtos', '''
+    CREATE TABLE IF NOT EXISTS produtos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feirante_id INTEGER NOT NULL,
+        nome VARCHAR(255) NOT NULL,
+        descricao TEXT,
+        preco CENTAVOS INTEGER NOT NULL,
+        quantidade_estoque INTEGER DEFAULT 0,
+        categoria_id INTEGER NOT NULL,
+        latitude DECIMAL(10,6),
+        longitude DECIMAL(10,6),
+        avaliacao_media DECIMAL(3,2) DEFAULT 0.0,
+        total_avaliacoes INTEGER DEFAULT 0,
+        ativo BOOLEAN DEFAULT 1,
+        data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (feirante_id) REFERENCES feirantes (id) ON DELETE CASCADE,
+        FOREIGN KEY (categoria_id) REFERENCES categorias (id)
+    )
+    '''),
+    ('avaliacoes_feirantes', '''
+    CREATE TABLE IF NOT EXISTS avaliacoes_feirantes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feirante_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        nota DECIMAL(2,1) NOT NULL CHECK (nota >= 0 AND nota <= 5),
+        comentario TEXT,
+        data_avaliacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (feirante_id) REFERENCES feirantes (id) ON DELETE CASCADE,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE,
+        UNIQUE(feirante_id, usuario_id)
+    )
+    '''),
+    ('avaliacoes_produtos', '''
+    CREATE TABLE IF NOT EXISTS avaliacoes_produtos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        produto_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        nota DECIMAL(2,1) NOT NULL CHECK (nota >= 0 AND nota <= 5),
+        comentario TEXT,
+        data_avaliacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE CASCADE,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE,
+        UNIQUE(produto_id, usuario_id)
+    )
+    '''),
+    ('mensagens', '''
+    CREATE TABLE IF NOT EXISTS mensagens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        remetente_id INTEGER NOT NULL,
+        destinatario_id INTEGER NOT NULL,
+        produto_id INTEGER,
+        mensagem TEXT NOT NULL,
+        lida BOOLEAN DEFAULT 0,
+        data_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (remetente_id) REFERENCES usuarios (id) ON DELETE CASCADE,
+        FOREIGN KEY (destinatario_id) REFERENCES usuarios (id) ON DELETE CASCADE,
+        FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE SET NULL
+    )
+    '''),
+    ('pedidos', '''
+    CREATE TABLE IF NOT EXISTS pedidos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL,
+        feirante_id INTEGER NOT NULL,
+        numero_pedido VARCHAR(100) UNIQUE NOT NULL,
+        status VARCHAR(50) NOT NULL,
+        valor_total CENTAVOS INTEGER NOT NULL,
+        metodo_pagamento VARCHAR(50) NOT NULL,
+        status_pagamento VARCHAR(50) NOT NULL,
+        data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id),
+        FOREIGN KEY (feirante_id) REFERENCES feirantes (id)
+    )
+    '''),
+    ('itens_pedido', '''
+    CREATE TABLE IF NOT EXISTS itens_pedido (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pedido_id INTEGER NOT NULL,
+        produto_id INTEGER NOT NULL,
+        quantidade INTEGER NOT NULL,
+        preco_unitario CENTAVOS INTEGER NOT NULL,
+        FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE,
+        FOREIGN KEY (produto_id) REFERENCES produtos (id)
+    )
+    '''),
+    ('carrinhos', '''
+    CREATE TABLE IF NOT EXISTS carrinhos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL UNIQUE,
+        data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE
+    )
+    '''),
+    ('itens_carrinho', '''
+    CREATE TABLE IF NOT EXISTS itens_carrinho (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        carrinho_id INTEGER NOT NULL,
+        produto_id INTEGER NOT NULL,
+        quantidade INTEGER NOT NULL,
+        FOREIGN KEY (carrinho_id) REFERENCES carrinhos (id) ON DELETE CASCADE,
+        FOREIGN KEY (produto_id) REFERENCES produtos (id),
+        UNIQUE(carrinho_id, produto_id)
+    )
+    '''),
+    ('historico_buscas', '''
+    CREATE TABLE IF NOT EXISTS historico_buscas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER,
+        termo_busca VARCHAR(255) NOT NULL,
+        latitude DECIMAL(10,6),
+        longitude DECIMAL(10,6),
+        data_busca TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE SET NULL
+    )
+    '''),
+    ('log_acoes', '''
+    CREATE TABLE IF NOT EXISTS log_acoes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER,
+        acao VARCHAR(255) NOT NULL,
+        detalhes TEXT,
+        data_acao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        ip_address VARCHAR(45),
+        FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE SET NULL
+    )
+    '''),
+    ('alteracoes', '''
+    CREATE TABLE IF NOT EXISTS alteracoes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela VARCHAR(50) NOT NULL,
+        operacao CHAR(1) NOT NULL CHECK (operacao IN ('I', 'U', 'D')),
+        registro_id INTEGER NOT NULL,
+        referencia_id INTEGER,
+        valor_anterior INTEGER,
+        valor_novo INTEGER,
+        data_alteracao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    '''),
+    ('consumidores_alteracoes', '''
+    CREATE TABLE IF NOT EXISTS consumidores_alteracoes (
+        nome VARCHAR(100) PRIMARY KEY,
+        ultimo_seq INTEGER NOT NULL DEFAULT 0,
+        data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    '''),
+    ('coocorrencias_produtos', '''
+    CREATE TABLE IF NOT EXISTS coocorrencias_produtos (
+        produto_a INTEGER NOT NULL,
+        produto_b INTEGER NOT NULL,
+        peso REAL NOT NULL,
+        PRIMARY KEY (produto_a, produto_b)
+    ) WITHOUT ROWID
+    '''),
+    ('frequencias_produtos', '''
+    CREATE TABLE IF NOT EXISTS frequencias_produtos (
+        produto_id INTEGER PRIMARY KEY,
+        peso REAL NOT NULL
+    )
+    '''),
+    ('recomendacoes_produtos', '''
+    CREATE TABLE IF NOT EXISTS recomendacoes_produtos (
+        produto_id INTEGER NOT NULL,
+        posicao INTEGER NOT NULL,
+        vizinho_id INTEGER NOT NULL,
+        pontuacao REAL NOT NULL,
+        PRIMARY KEY (produto_id, posicao)
+    ) WITHOUT ROWID
+    '''),
+    ('recomendacoes_usuarios', '''
+    CREATE TABLE IF NOT EXISTS recomendacoes_usuarios (
+        usuario_id INTEGER NOT NULL,
+        posicao INTEGER NOT NULL,
+        produto_id INTEGER NOT NULL,
+        pontuacao REAL NOT NULL,
+        PRIMARY KEY (usuario_id, posicao)
+    ) WITHOUT ROWID
+    '''),
+    ('itens_carrinho_contados', '''
+    CREATE TABLE IF NOT EXISTS itens_carrinho_contados (
+        item_id INTEGER PRIMARY KEY,
+        carrinho_id INTEGER NOT NULL,
+        usuario_id INTEGER,
+        produto_id INTEGER NOT NULL
+    )
+    '''),
+    ('estado_recomendacoes', '''
+    CREATE TABLE IF NOT EXISTS estado_recomendacoes (
+        chave VARCHAR(100) PRIMARY KEY,
+        valor INTEGER NOT NULL
+    )
+    '''),
+]
+
+INDICES = [
+    ('idx_usuarios_email',
+     'CREATE INDEX IF NOT EXISTS idx_usuarios_email ON usuarios(email)'),
+    ('idx_usuarios_tipo',
+     'CREATE INDEX IF NOT EXISTS idx_usuarios_tipo ON usuarios(tipo)'),
+    ('idx_usuarios_localizacao',
+     'CREATE INDEX IF NOT EXISTS idx_usuarios_localizacao ON usuarios(latitude, longitude)'),
+    # Índice de cobertura para o login: a busca por email não acessa a tabela
+    ('idx_usuarios_login',
+     'CREATE INDEX IF NOT EXISTS idx_usuarios_login ON usuarios(email, id, senha_hash, tipo, ativo)'),
+    ('idx_produtos_feirante',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_feirante ON produtos(feirante_id)'),
+    ('idx_produtos_categoria',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_categoria ON produtos(categoria_id)'),
+    ('idx_produtos_preco',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_preco ON produtos(preco)'),
+    ('idx_produtos_avaliacao',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_avaliacao ON produtos(avaliacao_media)'),
+    ('idx_produtos_localizacao',
+     'CREATE INDEX IF NOT EXISTS idx_produtos_localizacao ON produtos(latitude, longitude)'),
+    ('idx_pedidos_usuario',
+     'CREATE INDEX IF NOT EXISTS idx_pedidos_usuario ON pedidos(usuario_id)'),
+    ('idx_pedidos_feirante',
+     'CREATE INDEX IF NOT EXISTS idx_pedidos_feirante ON pedidos(feirante_id)'),
+    ('idx_pedidos_status',
+     'CREATE INDEX IF NOT EXISTS idx_pedidos_status ON pedidos(status)'),
+    ('idx_pedidos_data',
+     'CREATE INDEX IF NOT EXISTS idx_pedidos_data ON pedidos(data_criacao)'),
+    ('idx_itens_pedido_pedido',
+     'CREATE INDEX IF NOT EXISTS idx_itens_pedido_pedido ON itens_pedido(pedido_id, produto_id)'),
+    ('idx_avaliacoes_feirante',
+     'CREATE INDEX IF NOT EXISTS idx_avaliacoes_feirante ON avaliacoes_feirantes(feirante_id)'),
+    ('idx_avaliacoes_produto',
+     'CREATE INDEX IF NOT EXISTS idx_avaliacoes_produto ON avaliacoes_produtos(produto_id)'),
+    ('idx_avaliacoes_usuario',
+     'CREATE INDEX IF NOT EXISTS idx_avaliacoes_usuario ON avaliacoes_produtos(usuario_id)'),
+    ('idx_mensagens_remetente',
+     'CREATE INDEX IF NOT EXISTS idx_mensagens_remetente ON mensagens(remetente_id)'),
+    ('idx_mensagens_destinatario',
+     'CREATE INDEX IF NOT EXISTS idx_mensagens_destinatario ON mensagens(destinatario_id)'),
+    ('idx_historico_usuario',
+     'CREATE INDEX IF NOT EXISTS idx_historico_usuario ON historico_buscas(usuario_id)'),
+    ('idx_itens_carrinho_contados_carrinho',
+     'CREATE INDEX IF NOT EXISTS idx_itens_carrinho_contados_carrinho '
+     'ON itens_carrinho_contados(carrinho_id, item_id)'),
+]
+
+
+def _gatilhos_alteracoes(tabela, campo, referencia):
+    """Gera os gatilhos que registram em ``alteracoes`` as mudanças de uma tabela.
+
+    Args:
+        tabela (str): Tabela monitorada
+        campo (str): Coluna registrada em valor_anterior/valor_novo
+        referencia (str): Coluna registrada em referencia_id
+
+    Returns:
+        list: Tuplas (nome do gatilho, SQL de criação)
+    """
+    colunas = 'tabela, operacao, registro_id, referencia_id, valor_anterior, valor_novo'
+    return [
+        (f'trg_{tabela}_insert', f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{tabela}_insert AFTER INSERT ON {tabela}
+    BEGIN
+        INSERT INTO alteracoes ({colunas})
+        VALUES ('{tabela}', 'I', NEW.id, NEW.{referencia}, NULL, NEW.{campo});
+    END
+    '''),
+        (f'trg_{tabela}_update', f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{tabela}_update AFTER UPDATE OF {campo} ON {tabela}
+    WHEN OLD.{campo} IS NOT NEW.{campo}
+    BEGIN
+        INSERT INTO alteracoes ({colunas})
+        VALUES ('{tabela}', 'U', NEW.id, NEW.{referencia}, OLD.{campo}, NEW.{campo});
+    END
+    '''),
+        (f'trg_{tabela}_delete', f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{tabela}_delete AFTER DELETE ON {tabela}
+    BEGIN
+        INSERT INTO alteracoes ({colunas})
+        VALUES ('{tabela}', 'D', OLD.id, OLD.{referencia}, OLD.{campo}, NULL);
+    END
+    '''),
+    ]
+
+
+# Gatilhos de captura de alterações (change feed)
+GATILHOS = (
+    _gatilhos_alteracoes('produtos', 'quantidade_estoque', 'feirante_id')
+    + _gatilhos_alteracoes('pedidos', 'status', 'feirante_id')
+    + _gatilhos_alteracoes('itens_carrinho', 'quantidade', 'produto_id')
+)
+
+CATEGORIAS_EXEMPLO = [
+    ('Frutas', 'Frutas frescas e variadas'),
+    ('Verduras', 'Verduras e legumes frescos'),
+    ('Laticínios', 'Queijos, iogurtes e derivados do leite'),
+    ('Padaria', 'Pães, bolos e produtos de padaria'),
+    ('Orgânicos', 'Produtos cultivados sem agrotóxicos')
+]
+
+# Colunas monetárias armazenadas em centavos inteiros (ver money.py)
+COLUNAS_MONETARIAS = {
+    'produtos': ('preco',),
+    'pedidos': ('valor_total',),
+    'itens_pedido': ('preco_unitario',),
+}
+
+
+def _migrar_valores_para_centavos(conn):
+    """Converte para centavos inteiros as colunas monetárias gravadas como REAL.
+
+    Como o SQLite não altera o tipo de uma coluna, cada tabela afetada é
+    recriada com a definição atual, copiada com os valores multiplicados por
+    100 e renomeada. Índices e gatilhos removidos junto com a tabela antiga
+    são recriados em seguida por ``bootstrap``. Deve ser executada dentro de
+    uma transação, com as chaves estrangeiras desativadas.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    definicoes = dict(TABELAS)
+
+    for tabela, monetarias in COLUNAS_MONETARIAS.items():
+        colunas = conn.execute(f'PRAGMA table_info({tabela})').fetchall()
+        tipos = {coluna[1]: coluna[2].upper() for coluna in colunas}
+        if not colunas or all(tipos[nome].startswith(TIPO_CENTAVOS) for nome in monetarias):
+            continue
+
+        # A sequência do AUTOINCREMENT é descartada junto com a tabela antiga
+        sequencia = conn.execute(
+            'SELECT seq FROM sqlite_sequence WHERE name = ?', (tabela,)
+        ).fetchone()
+
+        temporaria = f'{tabela}_centavos'
+        conn.execute(definicoes[tabela].replace(
+            f'CREATE TABLE IF NOT EXISTS {tabela} (', f'CREATE TABLE {temporaria} ('
+        ))
+
+        nomes = [coluna[1] for coluna in colunas]
+        selecao = [
+            f'CAST(ROUND({nome} * 100) AS INTEGER)' if nome in monetarias else nome
+            for nome in nomes
+        ]
+        conn.execute(
+            f"INSERT INTO {temporaria} ({', '.join(nomes)}) "
+            f"SELECT {', '.join(selecao)} FROM {tabela}"
+        )
+        conn.execute(f'DROP TABLE {tabela}')
+        conn.execute(f'ALTER TABLE {temporaria} RENAME TO {tabela}')
+
+        if sequencia:
+            conn.execute('DELETE FROM sqlite_sequence WHERE name = ?', (tabela,))
+            conn.execute(
+                'INSERT INTO sqlite_sequence (name, seq) '
+                f'SELECT ?, MAX(?, COALESCE(MAX(id), 0)) FROM {tabela}',
+                (tabela, sequencia[0])
             )
-            ''')
-
-            # Tabela avaliacoes_produtos
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS avaliacoes_produtos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                produto_id INTEGER NOT NULL,
-                usuario_id INTEGER NOT NULL,
-                nota DECIMAL(2,1) NOT NULL CHECK (nota >= 0 AND nota <= 5),
-                comentario TEXT,
-                data_avaliacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE CASCADE,
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE,
-                UNIQUE(produto_id, usuario_id)
-            )
-            ''')
-
-            # Tabela mensagens
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS mensagens (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                remetente_id INTEGER NOT NULL,
-                destinatario_id INTEGER NOT NULL,
-                produto_id INTEGER,
-                mensagem TEXT NOT NULL,
-                lida BOOLEAN DEFAULT 0,
-                data_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (remetente_id) REFERENCES usuarios (id) ON DELETE CASCADE,
-                FOREIGN KEY (destinatario_id) REFERENCES usuarios (id) ON DELETE CASCADE,
-                FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE SET NULL
-            )
-            ''')
-
-            # Tabela pedidos
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pedidos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                usuario_id INTEGER NOT NULL,
-                feirante_id INTEGER NOT NULL,
-                numero_pedido VARCHAR(100) UNIQUE NOT NULL,
-                status VARCHAR(50) NOT NULL,
-                valor_total DECIMAL(10,2) NOT NULL,
-                metodo_pagamento VARCHAR(50) NOT NULL,
-                status_pagamento VARCHAR(50) NOT NULL,
-                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id),
-                FOREIGN KEY (feirante_id) REFERENCES feirantes (id)
-            )
-            ''')
-
-            # Tabela itens_pedido
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS itens_pedido (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                pedido_id INTEGER NOT NULL,
-                produto_id INTEGER NOT NULL,
-                quantidade INTEGER NOT NULL,
-                preco_unitario DECIMAL(10,2) NOT NULL,
-                FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE,
-                FOREIGN KEY (produto_id) REFERENCES produtos (id)
-            )
-            ''')
-
-            # Tabela carrinhos
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS carrinhos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                usuario_id INTEGER NOT NULL UNIQUE,
-                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE CASCADE
-            )
-            ''')
-
-            # Tabela itens_carrinho
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS itens_carrinho (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                carrinho_id INTEGER NOT NULL,
-                produto_id INTEGER NOT NULL,
-                quantidade INTEGER NOT NULL,
-                FOREIGN KEY (carrinho_id) REFERENCES carrinhos (id) ON DELETE CASCADE,
-                FOREIGN KEY (produto_id) REFERENCES produtos (id),
-                UNIQUE(carrinho_id, produto_id)
-            )
-            ''')
-
-            # Tabela historico_buscas
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS historico_buscas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                usuario_id INTEGER,
-                termo_busca VARCHAR(255) NOT NULL,
-                latitude DECIMAL(10,6),
-                longitude DECIMAL(10,6),
-                data_busca TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE SET NULL
-            )
-            ''')
-
-            # Tabela log_acoes
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS log_acoes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                usuario_id INTEGER,
-                acao VARCHAR(255) NOT NULL,
-                detalhes TEXT,
-                data_acao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ip_address VARCHAR(45),
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id) ON DELETE SET NULL
-            )
-            ''')
 
-            self.conn.commit()
-            print("Todas as tabelas foram criadas com sucesso!")
-            return True
 
-        except sqlite3.Error as error:
-            print(f"Erro ao criar tabelas: {error}")
-            return False
+# Migrações de dados aplicadas por bootstrap: (versão do esquema, função)
+MIGRACOES = [
+    (4, _migrar_valores_para_centavos),
+]
 
-    def insert_sample_data(self):
-        """Insere alguns dados de exemplo para teste."""
-        try:
-            cursor = self.conn.cursor()
-
-            # Inserir categorias de exemplo
-            categorias = [
-                ('Frutas', 'Frutas frescas e variadas'),
-                ('Verduras', 'Verduras e legumes frescos'),
-                ('Laticínios', 'Queijos, iogurtes e derivados do leite'),
-                ('Padaria', 'Pães, bolos e produtos de padaria'),
-                ('Orgânicos', 'Produtos cultivados sem agrotóxicos')
-            ]
-
-            cursor.executemany(
-                'INSERT OR IGNORE INTO categorias (nome, descricao) VALUES (?, ?)',
-                categorias
-            )
 
-            self.conn.commit()
-            print("Dados de exemplo inseridos com sucesso!")
+def bootstrap(db_name='feira_livre.db', dados_exemplo=False, timeout=30.0):
+    """Inicializa o esquema do banco de forma idempotente e não interativa.
 
-        except sqlite3.Error as error:
-            print(f"Erro ao inserir dados de exemplo: {error}")
+    Quando o esquema já está na versão atual, a única operação realizada é a
+    leitura de ``PRAGMA user_version``. Caso contrário, a inicialização ocorre
+    dentro de uma transação ``BEGIN IMMEDIATE``: se vários processos iniciarem
+    ao mesmo tempo, apenas um obtém o bloqueio de escrita e cria os objetos
+    ausentes, enquanto os demais aguardam (até ``timeout``) e, ao obterem o
+    bloqueio, encontram o esquema já pronto. Em bancos criados por versões
+    anteriores, as migrações pendentes de MIGRACOES são aplicadas antes.
 
-    def create_indexes(self):
-        """Cria índices para melhorar performance."""
-        try:
-            cursor = self.conn.cursor()
+    Args:
+        db_name (str): Nome do arquivo do banco de dados. Padrão: 'feira_livre.db'
+        dados_exemplo (bool): Se True, insere as categorias de exemplo. Padrão: False
+        timeout (float): Tempo máximo, em segundos, de espera pelo bloqueio de escrita
 
-            # Índices para tabela usuarios
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_usuarios_email ON usuarios(email)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_usuarios_tipo ON usuarios(tipo)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_usuarios_localizacao ON usuarios(latitude, longitude)'
-            )
+    Returns:
+        list: Nomes das tabelas, índices e gatilhos criados (vazia se nada foi criado)
 
-            # Índices para tabela produtos
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_produtos_feirante ON produtos(feirante_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_produtos_categoria ON produtos(categoria_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_produtos_preco ON produtos(preco)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_produtos_avaliacao ON produtos(avaliacao_media)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_produtos_localizacao ON produtos(latitude, longitude)'
-            )
+    Raises:
+        RuntimeError: Se ocorrer erro ao inicializar o banco de dados
+    """
+    try:
+        conn = sqlite3.connect(db_name, timeout=timeout, isolation_level=None)
+    except sqlite3.Error as exc:
+        raise RuntimeError(f"Erro ao conectar ao banco de dados: {exc}") from exc
 
-            # Índices para tabela pedidos
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_pedidos_usuario ON pedidos(usuario_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_pedidos_feirante ON pedidos(feirante_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_pedidos_status ON pedidos(status)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_pedidos_data ON pedidos(data_criacao)'
-            )
+    try:
+        versao = conn.execute('PRAGMA user_version').fetchone()[0]
+        if versao >= SCHEMA_VERSION and not dados_exemplo:
+            return []
 
-            # Índices para outras tabelas
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_avaliacoes_feirante ON avaliacoes_feirantes(feirante_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_avaliacoes_produto ON avaliacoes_produtos(produto_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_mensagens_remetente ON mensagens(remetente_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_mensagens_destinatario ON mensagens(destinatario_id)'
-            )
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_historico_usuario ON historico_buscas(usuario_id)'
-            )
-
-            self.conn.commit()
-            print("Índices criados com sucesso!")
-
-        except sqlite3.Error as error:
-            print(f"Erro ao criar índices: {error}")
-
-    def close(self):
-        """Fecha a conexão com o banco de dados."""
-        if self.conn:
-            self.conn.close()
-            print("Conexão com o banco de dados fechada")
-
-
-def main():
-    """Função principal para criar o banco de dados."""
-    db_manager = DatabaseManager()
-
-    if db_manager.connect():
-        # Criar tabelas
-        if db_manager.create_tables():
-            # Criar índices
-            db_manager.create_indexes()
-
-            # Inserir dados de exemplo (opcional)
+        criados = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Outro processo pode ter concluído a inicialização enquanto aguardávamos
+            versao = conn.execute('PRAGMA user_version').fetchone()[0]
+            if versao < SCHEMA_VERSION:
+                for versao_migracao, migracao in MIGRACOES:
+                    if versao < versao_migracao:
+                        migracao(conn)
+
+                existentes = {
+                    nome for (nome,) in conn.execute(
+                        "SELECT name FROM sqlite_master "
+                        "WHERE type IN ('table', 'index', 'trigger')"
+                    )
+                }
+                for nome, sql in TABELAS + INDICES + GATILHOS:
+                    if nome not in existentes:
+                        conn.execute(sql)
+                        criados.append(nome)
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+            if dados_exemplo:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO categorias (nome, descricao) VALUES (?, ?)',
+                    CATEGORIAS_EXEMPLO
+                )
+
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        return criados
+    except sqlite3.Error as exc:
+        raise RuntimeError(f"Erro ao inicializar banco de dados: {exc}") from exc
+    finally:
+        conn.close()
+
+
+def _parse_args(argv):
+    """Interpreta os argumentos de linha de comando.
+
+    Args:
+        argv (list): Argumentos de linha de comando (sem o nome do programa)
+
+    Returns:
+        argparse.Namespace: Argumentos interpretados
+    """
+    parser = argparse.ArgumentParser(
+        description='Cria ou atualiza o banco de dados da feira livre.'
+    )
+    parser.add_argument(
+        '--banco', default='feira_livre.db',
+        help="arquivo do banco de dados (padrão: 'feira_livre.db')"
+    )
+    exemplo = parser.add_mutually_exclusive_group()
+    exemplo.add_argument(
+        '--dados-exemplo', dest='dados_exemplo', action='store_true', default=None,
+        help='insere as categorias de exemplo'
+    )
+    exemplo.add_argument(
+        '--sem-dados-exemplo', dest='dados_exemplo', action='store_false',
+        help='não insere dados de exemplo'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=30.0,
+        help='segundos de espera caso outro processo esteja inicializando o banco'
+    )
+    parser.add_argument(
+        '-q', '--silencioso', action='store_true',
+        help='não exibe mensagens de progresso'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Função principal para criar o banco de dados.
+
+    Sem ``--dados-exemplo``/``--sem-dados-exemplo``, pergunta se os dados de
+    exemplo devem ser inseridos apenas quando a entrada padrão é um terminal.
+
+    Args:
+        argv (list, optional): Argumentos de linha de comando. Padrão: sys.argv[1:]
+
+    Returns:
+        int: Código de saída (0 em caso de sucesso)
+    """
+    args = _parse_args(argv)
+
+    dados_exemplo = args.dados_exemplo
+    if dados_exemplo is None:
+        dados_exemplo = False
+        if sys.stdin.isatty():
             inserir_exemplo = input(
                 "Deseja inserir dados de exemplo? (s/n): "
             ).lower().strip()
-            if inserir_exemplo == 's':
-                db_manager.insert_sample_data()
+            dados_exemplo = inserir_exemplo == 's'
+
+    try:
+        criados = bootstrap(args.banco, dados_exemplo, args.timeout)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    if not args.silencioso:
+        if criados:
+            print(f"Objetos criados em {args.banco}: {', '.join(criados)}")
+        else:
+            print(f"Esquema de {args.banco} já está atualizado")
+        if dados_exemplo:
+            print("Dados de exemplo inseridos com sucesso!")
 
-        # Fechar conexão
-        db_manager.close()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -4,6 +4,17 @@ Módulo para operações no banco de dados do sistema de feira livre.
 
 import sqlite3
 
+from money import de_centavos
+
+# Colunas retornadas por buscar_produtos_por_localizacao, na ordem das tuplas
+COLUNAS_BUSCA_PRODUTOS = (
+    'p.id', 'p.feirante_id', 'p.nome', 'p.descricao',
+    'p.preco AS "preco [CENTAVOS]"', 'p.quantidade_estoque',
+    'p.categoria_id', 'p.latitude', 'p.longitude', 'p.avaliacao_media',
+    'p.total_avaliacoes', 'p.ativo', 'p.data_criacao',
+    'f.nome_estabelecimento', 'c.nome as categoria_nome',
+)
+
 
 class DatabaseOperations:
     """Classe para operações no banco de dados."""
@@ -19,10 +30,13 @@ class DatabaseOperations:
     def get_connection(self):
         """Retorna uma conexão com o banco de dados.
 
+        Colunas com alias no formato ``"nome [CENTAVOS]"`` são convertidas
+        para Decimal (ver money.py).
+
         Returns:
             sqlite3.Connection: Conexão com o banco de dados
         """
-        conn = sqlite3.connect(self.db_name)
+        conn = sqlite3.connect(self.db_name, detect_types=sqlite3.PARSE_COLNAMES)
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
@@ -46,6 +60,7 @@ class DatabaseOperations:
             ValueError: Se email já estiver cadastrado
             RuntimeError: Se ocorrer erro ao criar usuário
         """
+        conn = None
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
@@ -65,13 +80,17 @@ class DatabaseOperations:
 
             user_id = cursor.lastrowid
             conn.commit()
-            conn.close()
 
             return user_id
         except sqlite3.IntegrityError as exc:
             raise ValueError("Email já cadastrado") from exc
         except Exception as exc:
             raise RuntimeError(f"Erro ao criar usuário: {exc}") from exc
+        finally:
+            # Fechada também em caso de erro, para não manter a transação
+            # (e o bloqueio de escrita) aberta até a coleta de lixo
+            if conn:
+                conn.close()
 
     def buscar_usuario_por_email(self, email):
         """Busca um usuário pelo email.
@@ -97,6 +116,52 @@ class DatabaseOperations:
         except Exception as exc:
             raise RuntimeError(f"Erro ao buscar usuário: {exc}") from exc
 
+    def buscar_credenciais_por_email(self, email):
+        """Busca apenas os dados necessários ao login de um usuário.
+
+        A consulta é resolvida inteiramente pelo índice de cobertura
+        idx_usuarios_login, sem leitura das linhas da tabela usuarios.
+
+        Args:
+            email (str): Email do usuário
+
+        Returns:
+            tuple: (id, senha_hash, tipo, ativo) ou None se não encontrado
+
+        Raises:
+            RuntimeError: Se ocorrer erro na busca
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+            SELECT id, senha_hash, tipo, ativo
+            FROM usuarios INDEXED BY idx_usuarios_login
+            WHERE email = ?
+            ''', (email,))
+            credenciais = cursor.fetchone()
+
+            conn.close()
+            return credenciais
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao buscar credenciais: {exc}") from exc
+
+    def _filtro_localizacao(self, latitude, longitude, raio_km):
+        """Retorna o filtro de proximidade aplicado à busca de produtos.
+
+        Args:
+            latitude (float): Latitude da localização de busca
+            longitude (float): Longitude da localização de busca
+            raio_km (int): Raio de busca em km
+
+        Returns:
+            tuple: (trecho SQL iniciado por AND, lista de parâmetros)
+        """
+        # Parâmetros não utilizados para futura implementação de busca por proximidade
+        _ = latitude, longitude, raio_km  # Marcados como não utilizados
+        return '', []
+
     def buscar_produtos_por_localizacao(self, latitude, longitude,
                                         raio_km=10, categoria_id=None):
         """Busca produtos por localização (simulação de busca por proximidade).
@@ -113,22 +178,20 @@ class DatabaseOperations:
         Raises:
             RuntimeError: Se ocorrer erro na busca
         """
-        # Parâmetros não utilizados para futura implementação de busca por proximidade
-        _ = latitude, longitude, raio_km  # Marcados como não utilizados
-
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            query = '''
-            SELECT p.*, f.nome_estabelecimento, c.nome as categoria_nome
+            query = f'''
+            SELECT {', '.join(COLUNAS_BUSCA_PRODUTOS)}
             FROM produtos p
             JOIN feirantes f ON p.feirante_id = f.id
             JOIN categorias c ON p.categoria_id = c.id
             WHERE p.ativo = 1 AND f.ativo = 1
             '''
 
-            params = []
+            filtro, params = self._filtro_localizacao(latitude, longitude, raio_km)
+            query += filtro
 
             if categoria_id:
                 query += ' AND p.categoria_id = ?'
@@ -179,12 +242,16 @@ class DatabaseOperations:
             else:
                 carrinho_id = carrinho[0]
 
-            # Adicionar item ao carrinho
+            # Adicionar item ao carrinho, somando à quantidade se já existir. O
+            # UPSERT mantém a linha (e seu id) e dispara o gatilho de UPDATE,
+            # ao contrário de INSERT OR REPLACE, que apagaria a linha sem
+            # registrar a remoção no feed de alterações
             cursor.execute('''
-            INSERT OR REPLACE INTO itens_carrinho (carrinho_id, produto_id, quantidade)
-            VALUES (?, ?, COALESCE((SELECT quantidade FROM itens_carrinho
-            WHERE carrinho_id = ? AND produto_id = ?), 0) + ?)
-            ''', (carrinho_id, produto_id, carrinho_id, produto_id, quantidade))
+            INSERT INTO itens_carrinho (carrinho_id, produto_id, quantidade)
+            VALUES (?, ?, ?)
+            ON CONFLICT(carrinho_id, produto_id)
+            DO UPDATE SET quantidade = quantidade + excluded.quantidade
+            ''', (carrinho_id, produto_id, quantidade))
 
             conn.commit()
             conn.close()
@@ -193,6 +260,150 @@ class DatabaseOperations:
         except Exception as exc:
             raise RuntimeError(f"Erro ao adicionar ao carrinho: {exc}") from exc
 
+    def buscar_comprados_juntos(self, produto_id, limite=10):
+        """Busca os produtos frequentemente comprados junto com um produto.
+
+        Lê as recomendações pré-calculadas por recommendations.py, pela chave
+        primária de recomendacoes_produtos.
+
+        Args:
+            produto_id (int): ID do produto
+            limite (int, optional): Quantidade máxima de produtos. Defaults to 10.
+
+        Returns:
+            list: Tuplas (id, nome, preco, pontuacao) em ordem de relevância
+
+        Raises:
+            RuntimeError: Se ocorrer erro na busca
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+            SELECT p.id, p.nome, p.preco AS "preco [CENTAVOS]", r.pontuacao
+            FROM recomendacoes_produtos r
+            JOIN produtos p ON p.id = r.vizinho_id
+            WHERE r.produto_id = ? AND p.ativo = 1
+            ORDER BY r.posicao
+            LIMIT ?
+            ''', (produto_id, limite))
+            produtos = cursor.fetchall()
+
+            conn.close()
+            return produtos
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao buscar produtos relacionados: {exc}") from exc
+
+    def buscar_recomendacoes_usuario(self, usuario_id, limite=10):
+        """Busca os produtos recomendados para um usuário.
+
+        Lê as recomendações pré-calculadas por recommendations.py, pela chave
+        primária de recomendacoes_usuarios.
+
+        Args:
+            usuario_id (int): ID do usuário
+            limite (int, optional): Quantidade máxima de produtos. Defaults to 10.
+
+        Returns:
+            list: Tuplas (id, nome, preco, pontuacao) em ordem de relevância
+
+        Raises:
+            RuntimeError: Se ocorrer erro na busca
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+            SELECT p.id, p.nome, p.preco AS "preco [CENTAVOS]", r.pontuacao
+            FROM recomendacoes_usuarios r
+            JOIN produtos p ON p.id = r.produto_id
+            WHERE r.usuario_id = ? AND p.ativo = 1
+            ORDER BY r.posicao
+            LIMIT ?
+            ''', (usuario_id, limite))
+            produtos = cursor.fetchall()
+
+            conn.close()
+            return produtos
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao buscar recomendações: {exc}") from exc
+
+    def calcular_total_carrinho(self, usuario_id):
+        """Calcula o valor total do carrinho do usuário.
+
+        A soma é feita em centavos inteiros pelo próprio SQLite.
+
+        Args:
+            usuario_id (int): ID do usuário
+
+        Returns:
+            Decimal: Valor total do carrinho (0.00 se vazio ou inexistente)
+
+        Raises:
+            RuntimeError: Se ocorrer erro no cálculo
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute('''
+            SELECT COALESCE(SUM(ic.quantidade * p.preco), 0)
+            FROM carrinhos c
+            JOIN itens_carrinho ic ON ic.carrinho_id = c.id
+            JOIN produtos p ON p.id = ic.produto_id
+            WHERE c.usuario_id = ?
+            ''', (usuario_id,))
+            total = de_centavos(cursor.fetchone()[0])
+
+            conn.close()
+            return total
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao calcular total do carrinho: {exc}") from exc
+
+    def calcular_total_vendas(self, feirante_id=None, status=None):
+        """Soma o valor total dos pedidos, opcionalmente por feirante e status.
+
+        A soma é feita em centavos inteiros pelo próprio SQLite.
+
+        Args:
+            feirante_id (int, optional): ID do feirante. Defaults to None (todos).
+            status (str, optional): Status dos pedidos. Defaults to None (todos).
+
+        Returns:
+            Decimal: Valor total das vendas
+
+        Raises:
+            RuntimeError: Se ocorrer erro no cálculo
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            query = '''
+            SELECT COALESCE(SUM(valor_total), 0)
+            FROM pedidos
+            WHERE 1 = 1
+            '''
+            params = []
+
+            if feirante_id:
+                query += ' AND feirante_id = ?'
+                params.append(feirante_id)
+
+            if status:
+                query += ' AND status = ?'
+                params.append(status)
+
+            cursor.execute(query, params)
+            total = de_centavos(cursor.fetchone()[0])
+
+            conn.close()
+            return total
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao calcular total de vendas: {exc}") from exc
+
 
 # Exemplo de uso
 if __name__ == "__main__":
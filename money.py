@@ -0,0 +1,96 @@
+"""
+Módulo para representação de valores monetários em centavos inteiros.
+
+Preços e totais são gravados no banco como INTEGER (centavos), o que torna
+as somas exatas e executáveis diretamente no SQLite. Na API Python os
+valores continuam sendo aceitos como Decimal, int, float ou str e são
+devolvidos como Decimal com duas casas.
+
+Colunas monetárias são declaradas com o tipo ``CENTAVOS INTEGER`` (afinidade
+INTEGER). Consultas feitas com ``detect_types=sqlite3.PARSE_COLNAMES`` podem
+converter qualquer coluna para Decimal usando o alias ``"nome [CENTAVOS]"``.
+"""
+
+import sqlite3
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+TIPO_CENTAVOS = 'CENTAVOS'
+
+_UM_CENTAVO = Decimal('0.01')
+
+
+def para_centavos(valor):
+    """Converte um valor monetário para centavos inteiros.
+
+    Floats são convertidos a partir de sua representação decimal, de modo
+    que 8.5 resulta em 850 e 0.29 em 29. Frações de centavo são arredondadas
+    para cima a partir da metade.
+
+    Args:
+        valor (Decimal, int, float ou str): Valor em reais
+
+    Returns:
+        int: Valor em centavos
+
+    Raises:
+        ValueError: Se o valor não for numérico
+    """
+    if isinstance(valor, bool):
+        raise ValueError(f"Valor monetário inválido: {valor!r}")
+    if isinstance(valor, float):
+        valor = repr(valor)
+
+    try:
+        decimal = Decimal(valor)
+    except (InvalidOperation, TypeError) as exc:
+        raise ValueError(f"Valor monetário inválido: {valor!r}") from exc
+
+    if not decimal.is_finite():
+        raise ValueError(f"Valor monetário inválido: {valor!r}")
+    return int(decimal.quantize(_UM_CENTAVO, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def de_centavos(centavos):
+    """Converte centavos inteiros para Decimal em reais.
+
+    Valores não inteiros indicam uma coluna ainda gravada em reais (REAL) e
+    são rejeitados em vez de truncados, para que 8.5 não vire R$0.08.
+
+    Args:
+        centavos (int): Valor em centavos
+
+    Returns:
+        Decimal: Valor em reais, com duas casas decimais
+
+    Raises:
+        ValueError: Se o valor não for um inteiro
+    """
+    if isinstance(centavos, bool) or not isinstance(centavos, int):
+        raise ValueError(
+            f"Valor em centavos inválido: {centavos!r} (banco não migrado? execute bootstrap)"
+        )
+    return Decimal(centavos).scaleb(-2)
+
+
+def _converter_centavos(dados):
+    """Converte o valor bruto de uma coluna CENTAVOS para Decimal.
+
+    Args:
+        dados (bytes): Valor lido do SQLite
+
+    Returns:
+        Decimal: Valor em reais
+
+    Raises:
+        ValueError: Se o valor gravado não for um inteiro
+    """
+    try:
+        centavos = int(dados)
+    except ValueError as exc:
+        raise ValueError(
+            f"Valor em centavos inválido: {dados!r} (banco não migrado? execute bootstrap)"
+        ) from exc
+    return de_centavos(centavos)
+
+
+sqlite3.register_converter(TIPO_CENTAVOS, _converter_centavos)
@@ -0,0 +1,642 @@
+"""
+Módulo para geração das recomendações de produtos do sistema de feira livre.
+
+Um processamento offline acumula coocorrências entre produtos comprados no
+mesmo pedido ou colocados no mesmo carrinho e calcula, para cada produto, os
+k vizinhos mais similares (similaridade do cosseno). Para cada usuário, as
+recomendações combinam esses vizinhos com seus pedidos, carrinho, avaliações
+positivas e buscas recentes. Os resultados ficam nas tabelas
+``recomendacoes_produtos`` e ``recomendacoes_usuarios``, de modo que a
+consulta online é uma única leitura pela chave primária.
+
+O processamento é incremental: pedidos, avaliações e buscas são lidos a
+partir do último ID processado (gravado em ``estado_recomendacoes``) e os
+carrinhos a partir do feed de alterações. Só os produtos e usuários afetados
+pelos novos dados têm suas recomendações recalculadas.
+"""
+
+import argparse
+import heapq
+import math
+import sys
+from itertools import groupby
+from operator import itemgetter
+
+from change_feed import ChangeFeed
+from database_operations import DatabaseOperations
+
+CONSUMIDOR_FEED = 'recomendacoes'
+
+# Pesos de cada sinal na contagem de coocorrências e no perfil do usuário
+PESO_PEDIDO = 1.0
+PESO_CARRINHO = 0.5
+PESO_AVALIACAO = 1.0
+PESO_BUSCA = 0.3
+
+# Avaliações a partir desta nota contam como interesse; até NOTA_REJEICAO,
+# o produto deixa de ser recomendado ao usuário
+NOTA_POSITIVA = 4
+NOTA_REJEICAO = 2
+
+# Cestas maiores são truncadas para limitar o número de pares (n² / 2)
+MAX_ITENS_CESTA = 50
+
+# Chaves de estado_recomendacoes
+ULTIMO_PEDIDO = 'ultimo_pedido_id'
+ULTIMA_AVALIACAO = 'ultima_avaliacao_id'
+ULTIMA_BUSCA = 'ultima_busca_id'
+
+
+def ler_em_lotes(cursor, tamanho_lote=1000):
+    """Percorre o resultado de uma consulta lendo ``tamanho_lote`` linhas por vez.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor com a consulta já executada
+        tamanho_lote (int, optional): Linhas lidas por chamada. Defaults to 1000.
+
+    Yields:
+        tuple: Cada linha do resultado
+    """
+    while True:
+        linhas = cursor.fetchmany(tamanho_lote)
+        if not linhas:
+            return
+        yield from linhas
+
+
+def agrupar_cestas(linhas):
+    """Agrupa linhas ``(cesta_id, usuario_id, produto_id)`` ordenadas por cesta.
+
+    Args:
+        linhas (iterable): Linhas ordenadas por cesta_id
+
+    Yields:
+        tuple: (cesta_id, usuario_id, lista de produtos distintos)
+    """
+    for (cesta_id, usuario_id), itens in groupby(linhas, key=itemgetter(0, 1)):
+        produtos = list(dict.fromkeys(item[2] for item in itens))
+        yield cesta_id, usuario_id, produtos[:MAX_ITENS_CESTA]
+
+
+class RecommendationEngine:
+    """Classe para o cálculo offline das recomendações de produtos."""
+
+    def __init__(self, db_name='feira_livre.db', vizinhos=20, tamanho_lote=1000,
+                 cestas_por_gravacao=5000):
+        """Inicializa o motor de recomendações.
+
+        Args:
+            db_name (str): Nome do arquivo do banco de dados. Padrão: 'feira_livre.db'
+            vizinhos (int): Recomendações guardadas por produto e por usuário. Padrão: 20
+            tamanho_lote (int): Linhas lidas por fetchmany. Padrão: 1000
+            cestas_por_gravacao (int): Cestas acumuladas em memória antes de gravar
+                as contagens no banco. Padrão: 5000
+        """
+        self.db_ops = DatabaseOperations(db_name)
+        self.feed = ChangeFeed(db_name)
+        self.vizinhos = vizinhos
+        self.tamanho_lote = tamanho_lote
+        self.cestas_por_gravacao = cestas_por_gravacao
+
+    @staticmethod
+    def _ler_estado(cursor, chave):
+        """Lê a última posição processada de uma fonte de dados.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            chave (str): Chave em estado_recomendacoes
+
+        Returns:
+            int: Valor gravado ou 0 se a chave ainda não existir
+        """
+        cursor.execute('SELECT valor FROM estado_recomendacoes WHERE chave = ?', (chave,))
+        linha = cursor.fetchone()
+        return linha[0] if linha else 0
+
+    @staticmethod
+    def _gravar_estado(cursor, chave, valor):
+        """Grava a última posição processada de uma fonte de dados.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            chave (str): Chave em estado_recomendacoes
+            valor (int): Último ID processado
+        """
+        cursor.execute('''
+        INSERT INTO estado_recomendacoes (chave, valor) VALUES (?, ?)
+        ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor
+        ''', (chave, valor))
+
+    @staticmethod
+    def _gravar_contagens(cursor, pares, frequencias):
+        """Soma no banco as coocorrências e frequências acumuladas em memória.
+
+        Pesos negativos descontam contagens anteriores (itens removidos de
+        carrinhos); linhas cujo peso chega a zero são apagadas.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            pares (dict): Peso por par (produto_a, produto_b), com a < b
+            frequencias (dict): Peso por produto
+        """
+        cursor.executemany('''
+        INSERT INTO coocorrencias_produtos (produto_a, produto_b, peso) VALUES (?, ?, ?)
+        ON CONFLICT(produto_a, produto_b) DO UPDATE SET peso = peso + excluded.peso
+        ''', [
+            par
+            for (a, b), peso in pares.items() if peso
+            for par in ((a, b, peso), (b, a, peso))
+        ])
+        cursor.executemany('''
+        DELETE FROM coocorrencias_produtos
+        WHERE produto_a = ? AND produto_b = ? AND peso <= 0
+        ''', [
+            par
+            for (a, b), peso in pares.items() if peso < 0
+            for par in ((a, b), (b, a))
+        ])
+        cursor.executemany('''
+        INSERT INTO frequencias_produtos (produto_id, peso) VALUES (?, ?)
+        ON CONFLICT(produto_id) DO UPDATE SET peso = peso + excluded.peso
+        ''', [(produto, peso) for produto, peso in frequencias.items() if peso])
+        cursor.executemany(
+            'DELETE FROM frequencias_produtos WHERE produto_id = ? AND peso <= 0',
+            [(produto,) for produto, peso in frequencias.items() if peso < 0]
+        )
+        pares.clear()
+        frequencias.clear()
+
+    @staticmethod
+    def _contar_cesta(pares, frequencias, produtos, peso):
+        """Soma ``peso`` às frequências dos produtos e a cada par da cesta.
+
+        Args:
+            pares (dict): Peso por par (produto_a, produto_b), com a < b
+            frequencias (dict): Peso por produto
+            produtos (list): Produtos distintos da cesta
+            peso (float): Peso somado (negativo para descontar a cesta)
+        """
+        for produto in produtos:
+            frequencias[produto] = frequencias.get(produto, 0.0) + peso
+        for i, a in enumerate(produtos):
+            for b in produtos[i + 1:]:
+                par = (a, b) if a < b else (b, a)
+                pares[par] = pares.get(par, 0.0) + peso
+
+    def _acumular_cestas(self, cursor, cestas, peso, produtos_afetados, usuarios_afetados):
+        """Conta as coocorrências de uma sequência de cestas, gravando em blocos.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            cestas (iterable): Tuplas (cesta_id, usuario_id, produtos)
+            peso (float): Peso de cada coocorrência
+            produtos_afetados (set): Recebe os produtos das cestas
+            usuarios_afetados (set): Recebe os usuários das cestas
+
+        Returns:
+            int: Maior cesta_id processado (0 se nenhuma)
+        """
+        pares = {}
+        frequencias = {}
+        ultima_cesta = 0
+        for total, (cesta_id, usuario_id, produtos) in enumerate(cestas, 1):
+            ultima_cesta = cesta_id
+            usuarios_afetados.add(usuario_id)
+            produtos_afetados.update(produtos)
+            self._contar_cesta(pares, frequencias, produtos, peso)
+            if total % self.cestas_por_gravacao == 0:
+                self._gravar_contagens(cursor, pares, frequencias)
+        self._gravar_contagens(cursor, pares, frequencias)
+        return ultima_cesta
+
+    def _processar_pedidos(self, conn, cursor, produtos_afetados, usuarios_afetados):
+        """Conta as coocorrências dos pedidos posteriores ao último processado.
+
+        Args:
+            conn (sqlite3.Connection): Conexão da transação em andamento, usada
+                para a leitura em lotes dos itens de pedido
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            produtos_afetados (set): Recebe os produtos dos novos pedidos
+            usuarios_afetados (set): Recebe os clientes dos novos pedidos
+        """
+        ultimo_pedido = self._ler_estado(cursor, ULTIMO_PEDIDO)
+        leitura = conn.execute('''
+        SELECT ip.pedido_id, p.usuario_id, ip.produto_id
+        FROM itens_pedido ip
+        JOIN pedidos p ON p.id = ip.pedido_id
+        WHERE ip.pedido_id > ?
+        ORDER BY ip.pedido_id
+        ''', (ultimo_pedido,))
+        cestas = agrupar_cestas(ler_em_lotes(leitura, self.tamanho_lote))
+        ultimo_pedido = max(ultimo_pedido, self._acumular_cestas(
+            cursor, cestas, PESO_PEDIDO, produtos_afetados, usuarios_afetados))
+        self._gravar_estado(cursor, ULTIMO_PEDIDO, ultimo_pedido)
+
+    def _carrinhos_alterados(self, cursor, alteracoes):
+        """Identifica os carrinhos afetados por alterações em itens_carrinho.
+
+        O feed registra apenas o ID do item. O carrinho é obtido do próprio
+        item ou, se ele já foi removido, da última contagem em
+        itens_carrinho_contados.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            alteracoes (iterable): Alterações de itens_carrinho do feed
+
+        Returns:
+            tuple: (set de IDs de carrinhos, maior seq lida ou 0 se nenhuma)
+        """
+        carrinhos = set()
+        ultimo_seq = 0
+        for seq, _, _, item_id, *_ in alteracoes:
+            ultimo_seq = seq
+            cursor.execute('''
+            SELECT carrinho_id FROM itens_carrinho WHERE id = ?
+            UNION ALL
+            SELECT carrinho_id FROM itens_carrinho_contados WHERE item_id = ?
+            LIMIT 1
+            ''', (item_id, item_id))
+            linha = cursor.fetchone()
+            if linha:
+                carrinhos.add(linha[0])
+        return carrinhos, ultimo_seq
+
+    def _recontar_carrinhos(self, cursor, carrinhos, produtos_afetados, usuarios_afetados):
+        """Atualiza as coocorrências dos carrinhos para o seu conteúdo atual.
+
+        A contribuição de cada carrinho é a dos seus produtos atuais. A
+        contagem anterior, guardada em itens_carrinho_contados, é descontada e
+        a atual somada, de modo que inserções, aumentos de quantidade e
+        remoções sejam refletidos uma única vez e recontar um carrinho
+        inalterado não mude nada.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            carrinhos (iterable): IDs dos carrinhos a recontar
+            produtos_afetados (set): Recebe os produtos cujas contagens mudaram
+            usuarios_afetados (set): Recebe os donos dos carrinhos alterados
+        """
+        pares = {}
+        frequencias = {}
+        for total, carrinho_id in enumerate(sorted(carrinhos), 1):
+            cursor.execute('''
+            SELECT produto_id FROM itens_carrinho_contados
+            WHERE carrinho_id = ?
+            ORDER BY item_id
+            LIMIT ?
+            ''', (carrinho_id, MAX_ITENS_CESTA))
+            anteriores = [linha[0] for linha in cursor.fetchall()]
+            cursor.execute(
+                'SELECT id, produto_id FROM itens_carrinho WHERE carrinho_id = ? ORDER BY id',
+                (carrinho_id,)
+            )
+            itens = cursor.fetchall()
+            atuais = [produto for _, produto in itens[:MAX_ITENS_CESTA]]
+
+            # O dono é lido antes de apagar a contagem anterior, pois um
+            # carrinho removido não existe mais em carrinhos
+            cursor.execute('''
+            SELECT usuario_id FROM carrinhos WHERE id = ?
+            UNION ALL
+            SELECT usuario_id FROM itens_carrinho_contados WHERE carrinho_id = ?
+            LIMIT 1
+            ''', (carrinho_id, carrinho_id))
+            linha = cursor.fetchone()
+            dono = linha[0] if linha else None
+
+            cursor.execute(
+                'DELETE FROM itens_carrinho_contados WHERE carrinho_id = ?', (carrinho_id,)
+            )
+            cursor.executemany(
+                'INSERT INTO itens_carrinho_contados VALUES (?, ?, ?, ?)',
+                [(item_id, carrinho_id, dono, produto) for item_id, produto in itens]
+            )
+            if set(anteriores) == set(atuais):
+                continue
+
+            self._contar_cesta(pares, frequencias, anteriores, -PESO_CARRINHO)
+            self._contar_cesta(pares, frequencias, atuais, PESO_CARRINHO)
+            produtos_afetados.update(anteriores, atuais)
+            if dono is not None:
+                usuarios_afetados.add(dono)
+
+            if total % self.cestas_por_gravacao == 0:
+                self._gravar_contagens(cursor, pares, frequencias)
+        self._gravar_contagens(cursor, pares, frequencias)
+
+    def _processar_carrinhos(self, cursor, completo, produtos_afetados, usuarios_afetados):
+        """Conta as coocorrências dos carrinhos.
+
+        No processamento incremental, recontam-se os carrinhos com alterações
+        no feed desde a última execução. No completo, como o feed pode ter sido
+        podado, todos os carrinhos com itens são recontados a partir de uma
+        contagem vazia. Como a recontagem só depende do conteúdo atual, os dois
+        modos chegam às mesmas contagens.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            completo (bool): Se todos os carrinhos devem ser recontados
+            produtos_afetados (set): Recebe os produtos cujas contagens mudaram
+            usuarios_afetados (set): Recebe os donos dos carrinhos alterados
+        """
+        if completo:
+            ultimo_seq = self.feed.ultimo_seq()
+            cursor.execute('SELECT DISTINCT carrinho_id FROM itens_carrinho')
+            carrinhos = {linha[0] for linha in cursor.fetchall()}
+        else:
+            alteracoes = self.feed.iterar_alteracoes(
+                self.feed.posicao(CONSUMIDOR_FEED), self.tamanho_lote, ['itens_carrinho']
+            )
+            carrinhos, ultimo_seq = self._carrinhos_alterados(cursor, alteracoes)
+            if not ultimo_seq:
+                return
+
+        self._recontar_carrinhos(cursor, carrinhos, produtos_afetados, usuarios_afetados)
+
+        # Gravado na mesma transação das contagens; como a recontagem é
+        # idempotente, alterações lidas de novo após uma falha não mudam nada
+        cursor.execute('''
+        INSERT INTO consumidores_alteracoes (nome, ultimo_seq) VALUES (?, ?)
+        ON CONFLICT(nome) DO UPDATE SET
+            ultimo_seq = MAX(ultimo_seq, excluded.ultimo_seq),
+            data_atualizacao = CURRENT_TIMESTAMP
+        ''', (CONSUMIDOR_FEED, ultimo_seq))
+
+    def _usuarios_com_novos_dados(self, cursor, chave, tabela, usuarios_afetados):
+        """Marca os usuários com linhas novas em uma tabela e avança sua posição.
+
+        Usado para avaliações e buscas, que não alteram as coocorrências, mas
+        mudam o perfil e portanto as recomendações do usuário.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            chave (str): Chave da posição em estado_recomendacoes
+            tabela (str): 'avaliacoes_produtos' ou 'historico_buscas'
+            usuarios_afetados (set): Recebe os usuários das linhas novas
+        """
+        ultimo_id = self._ler_estado(cursor, chave)
+        cursor.execute(
+            f'SELECT MAX(id) FROM {tabela} WHERE id > ?', (ultimo_id,)
+        )
+        novo_ultimo = cursor.fetchone()[0]
+        if novo_ultimo is None:
+            return
+        cursor.execute(f'''
+        SELECT DISTINCT usuario_id FROM {tabela}
+        WHERE id > ? AND id <= ? AND usuario_id IS NOT NULL
+        ''', (ultimo_id, novo_ultimo))
+        usuarios_afetados.update(linha[0] for linha in cursor.fetchall())
+        self._gravar_estado(cursor, chave, novo_ultimo)
+
+    def _incluir_vizinhos(self, cursor, produtos_afetados):
+        """Acrescenta aos produtos afetados os vizinhos de cada um deles.
+
+        A pontuação de um vizinho depende da frequência do produto afetado;
+        quando só essa frequência muda, a lista do vizinho também precisa ser
+        recalculada para coincidir com a de uma execução completa.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            produtos_afetados (set): IDs dos produtos afetados; atualizado no lugar
+        """
+        vizinhos = set()
+        for produto in produtos_afetados:
+            cursor.execute(
+                'SELECT produto_b FROM coocorrencias_produtos WHERE produto_a = ?', (produto,)
+            )
+            vizinhos.update(vizinho for (vizinho,) in ler_em_lotes(cursor, self.tamanho_lote))
+        produtos_afetados |= vizinhos
+
+    def _atualizar_vizinhos(self, cursor, produtos):
+        """Recalcula os k vizinhos mais similares dos produtos informados.
+
+        A similaridade entre a e b é o cosseno entre seus vetores de cestas:
+        ``coocorrencia(a, b) / sqrt(frequencia(a) * frequencia(b))``. Apenas
+        produtos ativos são considerados vizinhos.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            produtos (iterable): IDs dos produtos a recalcular
+        """
+        for produto in produtos:
+            cursor.execute(
+                'SELECT peso FROM frequencias_produtos WHERE produto_id = ?', (produto,)
+            )
+            linha = cursor.fetchone()
+            cursor.execute(
+                'DELETE FROM recomendacoes_produtos WHERE produto_id = ?', (produto,)
+            )
+            if not linha:
+                continue
+
+            cursor.execute('''
+            SELECT c.produto_b, c.peso, f.peso
+            FROM coocorrencias_produtos c
+            JOIN frequencias_produtos f ON f.produto_id = c.produto_b
+            JOIN produtos p ON p.id = c.produto_b
+            WHERE c.produto_a = ? AND p.ativo = 1
+            ''', (produto,))
+            frequencia = linha[0]
+            melhores = heapq.nlargest(
+                self.vizinhos,
+                ((peso / math.sqrt(frequencia * frequencia_vizinho), vizinho)
+                 for vizinho, peso, frequencia_vizinho in ler_em_lotes(cursor, self.tamanho_lote))
+            )
+            cursor.executemany(
+                'INSERT INTO recomendacoes_produtos VALUES (?, ?, ?, ?)',
+                [(produto, posicao, vizinho, pontuacao)
+                 for posicao, (pontuacao, vizinho) in enumerate(melhores, 1)]
+            )
+
+    def _perfil_usuario(self, cursor, usuario_id):
+        """Monta o perfil de interesses de um usuário.
+
+        O perfil soma PESO_PEDIDO por compra de cada produto, PESO_CARRINHO
+        pelos itens do carrinho e PESO_AVALIACAO por avaliação positiva.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            usuario_id (int): ID do usuário
+
+        Returns:
+            tuple: (dict de peso por produto, set de produtos que não devem
+                ser recomendados: os que já estão no carrinho e os mal avaliados)
+        """
+        perfil = {}
+        cursor.execute('''
+        SELECT ip.produto_id, COUNT(*)
+        FROM pedidos p
+        JOIN itens_pedido ip ON ip.pedido_id = p.id
+        WHERE p.usuario_id = ?
+        GROUP BY ip.produto_id
+        ''', (usuario_id,))
+        for produto, vezes in cursor.fetchall():
+            perfil[produto] = perfil.get(produto, 0.0) + PESO_PEDIDO * vezes
+
+        cursor.execute('''
+        SELECT ic.produto_id
+        FROM carrinhos c
+        JOIN itens_carrinho ic ON ic.carrinho_id = c.id
+        WHERE c.usuario_id = ?
+        ''', (usuario_id,))
+        excluidos = set()
+        for (produto,) in cursor.fetchall():
+            perfil[produto] = perfil.get(produto, 0.0) + PESO_CARRINHO
+            excluidos.add(produto)
+
+        cursor.execute(
+            'SELECT produto_id, nota FROM avaliacoes_produtos WHERE usuario_id = ?',
+            (usuario_id,)
+        )
+        for produto, nota in cursor.fetchall():
+            if nota >= NOTA_POSITIVA:
+                perfil[produto] = perfil.get(produto, 0.0) + PESO_AVALIACAO
+            elif nota <= NOTA_REJEICAO:
+                excluidos.add(produto)
+
+        return perfil, excluidos
+
+    def _atualizar_usuarios(self, cursor, usuarios, buscas_recentes=5):
+        """Recalcula as recomendações dos usuários informados.
+
+        A pontuação de um candidato soma a similaridade com cada produto do
+        perfil, ponderada pelo peso desse produto, mais um bônus para produtos
+        que correspondem às buscas recentes. Produtos já comprados continuam
+        elegíveis (compras de feira se repetem); os que estão no carrinho e os
+        mal avaliados pelo usuário são descartados.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor da transação em andamento
+            usuarios (iterable): IDs dos usuários a recalcular
+            buscas_recentes (int, optional): Buscas consideradas por usuário.
+                Defaults to 5.
+        """
+        for usuario_id in usuarios:
+            perfil, excluidos = self._perfil_usuario(cursor, usuario_id)
+            pontuacoes = {}
+            for produto, peso in perfil.items():
+                cursor.execute('''
+                SELECT vizinho_id, pontuacao FROM recomendacoes_produtos
+                WHERE produto_id = ?
+                ''', (produto,))
+                for vizinho, pontuacao in cursor.fetchall():
+                    pontuacoes[vizinho] = pontuacoes.get(vizinho, 0.0) + peso * pontuacao
+
+            cursor.execute('''
+            SELECT DISTINCT termo_busca FROM historico_buscas
+            WHERE usuario_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+            ''', (usuario_id, buscas_recentes))
+            for (termo,) in cursor.fetchall():
+                cursor.execute('''
+                SELECT id FROM produtos
+                WHERE ativo = 1 AND nome LIKE ?
+                ORDER BY avaliacao_media DESC
+                LIMIT ?
+                ''', (f'%{termo}%', self.vizinhos))
+                for (produto,) in cursor.fetchall():
+                    pontuacoes[produto] = pontuacoes.get(produto, 0.0) + PESO_BUSCA
+
+            melhores = heapq.nlargest(
+                self.vizinhos,
+                ((pontuacao, produto) for produto, pontuacao in pontuacoes.items()
+                 if produto not in excluidos)
+            )
+            cursor.execute(
+                'DELETE FROM recomendacoes_usuarios WHERE usuario_id = ?', (usuario_id,)
+            )
+            cursor.executemany(
+                'INSERT INTO recomendacoes_usuarios VALUES (?, ?, ?, ?)',
+                [(usuario_id, posicao, produto, pontuacao)
+                 for posicao, (pontuacao, produto) in enumerate(melhores, 1)]
+            )
+
+    def executar(self, completo=False):
+        """Processa os novos dados e atualiza as recomendações afetadas.
+
+        Todo o processamento ocorre em uma única transação: as contagens, as
+        recomendações e as posições já processadas são gravadas juntas, de
+        modo que uma execução interrompida pode simplesmente ser repetida.
+
+        Args:
+            completo (bool, optional): Descarta as contagens e recalcula tudo
+                desde o início. Defaults to False.
+
+        Returns:
+            dict: Quantidade de produtos e usuários atualizados
+
+        Raises:
+            RuntimeError: Se ocorrer erro no processamento
+        """
+        conn = None
+        try:
+            conn = self.db_ops.get_connection()
+            cursor = conn.cursor()
+            conn.execute('BEGIN IMMEDIATE')
+
+            if completo:
+                for tabela in ('coocorrencias_produtos', 'frequencias_produtos',
+                               'recomendacoes_produtos', 'recomendacoes_usuarios',
+                               'estado_recomendacoes', 'itens_carrinho_contados'):
+                    cursor.execute(f'DELETE FROM {tabela}')
+
+            produtos_afetados = set()
+            usuarios_afetados = set()
+            self._processar_pedidos(conn, cursor, produtos_afetados, usuarios_afetados)
+            self._processar_carrinhos(cursor, completo, produtos_afetados, usuarios_afetados)
+            self._usuarios_com_novos_dados(cursor, ULTIMA_AVALIACAO, 'avaliacoes_produtos',
+                                           usuarios_afetados)
+            self._usuarios_com_novos_dados(cursor, ULTIMA_BUSCA, 'historico_buscas',
+                                           usuarios_afetados)
+
+            # Recalcula os produtos com contagens alteradas e seus vizinhos, e
+            # os usuários com novos dados. As listas de usuários não afetados
+            # mantêm as pontuações anteriores; --completo recalcula todas.
+            self._incluir_vizinhos(cursor, produtos_afetados)
+            self._atualizar_vizinhos(cursor, sorted(produtos_afetados))
+            self._atualizar_usuarios(cursor, sorted(usuarios_afetados))
+
+            conn.commit()
+
+            return {'produtos': len(produtos_afetados), 'usuarios': len(usuarios_afetados)}
+        except Exception as exc:
+            if conn is not None:
+                conn.rollback()
+            raise RuntimeError(f"Erro ao calcular recomendações: {exc}") from exc
+        finally:
+            if conn is not None:
+                conn.close()
+
+def main(argv=None):
+    """Executa o cálculo das recomendações pela linha de comando.
+
+    Args:
+        argv (list, optional): Argumentos da linha de comando. Defaults to None.
+
+    Returns:
+        int: Código de saída do processo
+    """
+    parser = argparse.ArgumentParser(description='Cálculo das recomendações de produtos.')
+    parser.add_argument('--banco', default='feira_livre.db',
+                        help='arquivo do banco de dados (padrão: feira_livre.db)')
+    parser.add_argument('--vizinhos', type=int, default=20,
+                        help='recomendações guardadas por produto e usuário (padrão: 20)')
+    parser.add_argument('--completo', action='store_true',
+                        help='descarta as contagens e recalcula tudo desde o início')
+    args = parser.parse_args(argv)
+
+    try:
+        engine = RecommendationEngine(args.banco, vizinhos=args.vizinhos)
+        resultado = engine.executar(completo=args.completo)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+    print(f"Recomendações atualizadas: {resultado['produtos']} produtos, "
+          f"{resultado['usuarios']} usuários")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,837 @@
+"""
+Módulo para particionamento (sharding) do banco de dados do sistema de feira livre por região.
+
+Feirantes, produtos, pedidos e carrinhos são gravados no arquivo da região
+derivada da latitude/longitude do feirante; usuários e o diretório de shards
+ficam no shard global. Como cada arquivo SQLite tem um único escritor, a
+vazão de escrita cresce com o número de regiões.
+"""
+
+import argparse
+import heapq
+import math
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from create_database import bootstrap
+from database_operations import COLUNAS_BUSCA_PRODUTOS, DatabaseOperations
+from money import para_centavos
+
+SHARD_GLOBAL = 'global'
+
+# Cada shard regional aloca IDs em um bloco próprio, evitando colisões entre arquivos
+BLOCO_IDS = 10 ** 12
+
+# Tabelas com AUTOINCREMENT cujos IDs precisam ser únicos entre shards
+TABELAS_REGIONAIS = (
+    'feirantes', 'produtos', 'pedidos', 'itens_pedido', 'carrinhos', 'itens_carrinho'
+)
+
+# Posição de avaliacao_media nas tuplas de buscar_produtos_por_localizacao
+INDICE_AVALIACAO_BUSCA = COLUNAS_BUSCA_PRODUTOS.index('p.avaliacao_media')
+
+# Regiões do Brasil aproximadas por retângulos; a primeira que contiver o ponto é usada
+REGIOES_PADRAO = [
+    {'nome': 'sul', 'lat_min': -34.0, 'lat_max': -22.5, 'lon_min': -58.0, 'lon_max': -48.0},
+    {'nome': 'sudeste', 'lat_min': -25.5, 'lat_max': -14.0, 'lon_min': -53.0, 'lon_max': -39.0},
+    {'nome': 'nordeste', 'lat_min': -18.5, 'lat_max': -1.0, 'lon_min': -48.5, 'lon_max': -34.5},
+    {'nome': 'centro_oeste', 'lat_min': -24.5, 'lat_max': -7.0, 'lon_min': -62.0, 'lon_max': -45.5},
+    {'nome': 'norte', 'lat_min': -13.5, 'lat_max': 5.5, 'lon_min': -74.0, 'lon_max': -46.0},
+]
+REGIAO_PADRAO = 'sudeste'
+
+# Tabelas mantidas apenas no shard global
+DIRETORIO_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS diretorio_shards (
+        tabela VARCHAR(50) NOT NULL,
+        registro_id INTEGER NOT NULL,
+        shard VARCHAR(50) NOT NULL,
+        PRIMARY KEY (tabela, registro_id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS blocos_shards (
+        shard VARCHAR(50) PRIMARY KEY,
+        bloco INTEGER NOT NULL UNIQUE
+    )
+    ''',
+]
+
+
+def caixa_delimitadora(latitude, longitude, raio_km):
+    """Calcula o retângulo de coordenadas que contém o círculo de busca.
+
+    Args:
+        latitude (float): Latitude do centro da busca
+        longitude (float): Longitude do centro da busca
+        raio_km (float): Raio de busca em km
+
+    Returns:
+        tuple: (lat_min, lat_max, lon_min, lon_max)
+    """
+    delta_lat = raio_km / 111.32
+    delta_lon = raio_km / (111.32 * max(math.cos(math.radians(latitude)), 0.01))
+    return (latitude - delta_lat, latitude + delta_lat,
+            longitude - delta_lon, longitude + delta_lon)
+
+
+class ShardRouter:
+    """Classe que mapeia coordenadas geográficas para arquivos de shard."""
+
+    def __init__(self, regioes=None, diretorio='shards', padrao=None):
+        """Inicializa o roteador de shards.
+
+        Args:
+            regioes (list, optional): Dicionários com nome, lat_min, lat_max,
+                lon_min e lon_max de cada região. Padrão: REGIOES_PADRAO
+            diretorio (str): Diretório dos arquivos de shard. Padrão: 'shards'
+            padrao (str, optional): Região usada para coordenadas ausentes ou fora
+                de todas as regiões. Padrão: REGIAO_PADRAO com as regiões padrão,
+                ou a primeira região informada
+        """
+        self.regioes = list(regioes or REGIOES_PADRAO)
+        self.diretorio = diretorio
+        if padrao is None:
+            padrao = REGIAO_PADRAO if regioes is None else self.regioes[0]['nome']
+        self.padrao = padrao
+
+    def nomes(self):
+        """Retorna os nomes dos shards regionais.
+
+        Returns:
+            list: Nomes das regiões, na ordem de configuração
+        """
+        return [regiao['nome'] for regiao in self.regioes]
+
+    def caminho(self, shard):
+        """Retorna o caminho do arquivo de um shard.
+
+        Args:
+            shard (str): Nome do shard
+
+        Returns:
+            str: Caminho do arquivo SQLite do shard
+        """
+        return os.path.join(self.diretorio, f'{shard}.db')
+
+    def shard_por_coordenadas(self, latitude, longitude):
+        """Determina o shard regional de uma coordenada.
+
+        Args:
+            latitude (float): Latitude do ponto
+            longitude (float): Longitude do ponto
+
+        Returns:
+            str: Nome do shard
+        """
+        if latitude is None or longitude is None:
+            return self.padrao
+
+        for regiao in self.regioes:
+            if (regiao['lat_min'] <= latitude <= regiao['lat_max']
+                    and regiao['lon_min'] <= longitude <= regiao['lon_max']):
+                return regiao['nome']
+        return self.padrao
+
+    def shards_no_raio(self, latitude, longitude, raio_km):
+        """Determina os shards que podem conter pontos dentro do raio informado.
+
+        Args:
+            latitude (float): Latitude do centro da busca
+            longitude (float): Longitude do centro da busca
+            raio_km (float): Raio de busca em km
+
+        Returns:
+            list: Nomes dos shards cuja região intercepta a área de busca
+        """
+        lat_min, lat_max, lon_min, lon_max = caixa_delimitadora(latitude, longitude, raio_km)
+
+        shards = [
+            regiao['nome'] for regiao in self.regioes
+            if regiao['lat_min'] <= lat_max
+            and regiao['lat_max'] >= lat_min
+            and regiao['lon_min'] <= lon_max
+            and regiao['lon_max'] >= lon_min
+        ]
+        centro = self.shard_por_coordenadas(latitude, longitude)
+        if centro not in shards:
+            shards.append(centro)
+        return shards
+
+
+class ShardOperations(DatabaseOperations):
+    """Operações em um shard regional.
+
+    As chaves estrangeiras para usuários apontam para o shard global e não
+    podem ser verificadas pelo SQLite; a validação é feita pelo
+    ShardedDatabaseOperations antes de cada escrita.
+    """
+
+    def get_connection(self):
+        """Retorna uma conexão com o shard, sem verificação de chaves estrangeiras.
+
+        Returns:
+            sqlite3.Connection: Conexão com o banco de dados do shard
+        """
+        return sqlite3.connect(self.db_name, detect_types=sqlite3.PARSE_COLNAMES)
+
+    def _filtro_localizacao(self, latitude, longitude, raio_km):
+        """Restringe a busca de produtos ao retângulo que contém o raio.
+
+        Sem esse filtro, uma busca que cruza a fronteira entre regiões
+        retornaria todos os produtos de cada shard consultado. Produtos sem
+        coordenadas não podem ser localizados e ficam fora do resultado.
+
+        Args:
+            latitude (float): Latitude da localização de busca
+            longitude (float): Longitude da localização de busca
+            raio_km (int): Raio de busca em km
+
+        Returns:
+            tuple: (trecho SQL iniciado por AND, lista de parâmetros)
+        """
+        lat_min, lat_max, lon_min, lon_max = caixa_delimitadora(latitude, longitude, raio_km)
+        return (
+            ' AND p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?',
+            [lat_min, lat_max, lon_min, lon_max]
+        )
+
+
+class ShardedDatabaseOperations:
+    """Classe que distribui as operações do banco entre shards regionais."""
+
+    def __init__(self, router=None):
+        """Inicializa os shards global e regionais, criando os arquivos ausentes.
+
+        Args:
+            router (ShardRouter, optional): Roteador de shards. Padrão: ShardRouter()
+        """
+        self.router = router or ShardRouter()
+        os.makedirs(self.router.diretorio, exist_ok=True)
+
+        self.global_ops = DatabaseOperations(self.router.caminho(SHARD_GLOBAL))
+        self._shards = {}
+        self._inicializar_shard(SHARD_GLOBAL)
+        for nome in self.router.nomes():
+            self._inicializar_shard(nome)
+
+    def _inicializar_shard(self, shard):
+        """Cria o esquema de um shard e reserva seu bloco de IDs.
+
+        A sequência de cada tabela regional só é levada ao início do bloco
+        quando está ausente ou abaixo dele. Assim, atualizações posteriores do
+        esquema não fazem o shard reutilizar IDs já alocados, inclusive os de
+        feirantes movidos por ``rebalancear``. Em um shard regional recém-criado,
+        as categorias do shard global são replicadas para que as consultas de
+        produtos possam usá-las localmente.
+
+        Args:
+            shard (str): Nome do shard
+        """
+        caminho = self.router.caminho(shard)
+        novo = not os.path.exists(caminho)
+        bootstrap(caminho)
+
+        conn = sqlite3.connect(caminho, timeout=30.0)
+        try:
+            if shard == SHARD_GLOBAL:
+                for sql in DIRETORIO_DDL:
+                    conn.execute(sql)
+            else:
+                base = self._bloco_do_shard(shard) * BLOCO_IDS
+                for tabela in TABELAS_REGIONAIS:
+                    conn.execute('''
+                    INSERT INTO sqlite_sequence (name, seq)
+                    SELECT ?, ? WHERE NOT EXISTS (
+                        SELECT 1 FROM sqlite_sequence WHERE name = ?
+                    )
+                    ''', (tabela, base, tabela))
+                    conn.execute(
+                        'UPDATE sqlite_sequence SET seq = ? WHERE name = ? AND seq < ?',
+                        (base, tabela, base)
+                    )
+            conn.commit()
+        finally:
+            conn.close()
+
+        if shard != SHARD_GLOBAL and novo:
+            self._replicar_categorias(shard)
+
+    def _bloco_do_shard(self, shard):
+        """Retorna o bloco de IDs de um shard, reservando um novo se necessário.
+
+        Os blocos ficam registrados no shard global para que não mudem quando
+        regiões são incluídas ou reordenadas no roteador.
+
+        Args:
+            shard (str): Nome do shard regional
+
+        Returns:
+            int: Número do bloco (a partir de 1)
+        """
+        conn = self.global_ops.get_connection()
+        try:
+            linha = conn.execute(
+                'SELECT bloco FROM blocos_shards WHERE shard = ?', (shard,)
+            ).fetchone()
+            if linha:
+                return linha[0]
+
+            conn.execute('''
+            INSERT OR IGNORE INTO blocos_shards (shard, bloco)
+            SELECT ?, COALESCE(MAX(bloco), 0) + 1 FROM blocos_shards
+            ''', (shard,))
+            conn.commit()
+            return conn.execute(
+                'SELECT bloco FROM blocos_shards WHERE shard = ?', (shard,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def _replicar_categorias(self, shard):
+        """Copia as categorias do shard global para um shard regional.
+
+        Args:
+            shard (str): Nome do shard regional
+        """
+        conn = sqlite3.connect(self.router.caminho(shard), timeout=30.0)
+        try:
+            conn.execute('ATTACH DATABASE ? AS dir', (self.router.caminho(SHARD_GLOBAL),))
+            conn.execute(
+                'INSERT OR REPLACE INTO main.categorias (id, nome, descricao) '
+                'SELECT id, nome, descricao FROM dir.categorias'
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def replicar_categorias(self):
+        """Replica as categorias do shard global para todos os shards regionais.
+
+        Deve ser chamado após incluir ou alterar categorias no shard global.
+        """
+        for nome in self.router.nomes():
+            self._replicar_categorias(nome)
+
+    def shard(self, nome):
+        """Retorna as operações de um shard regional.
+
+        Args:
+            nome (str): Nome do shard
+
+        Returns:
+            ShardOperations: Operações no arquivo do shard
+        """
+        if nome not in self._shards:
+            self._shards[nome] = ShardOperations(self.router.caminho(nome))
+        return self._shards[nome]
+
+    def _localizar(self, tabela, registro_id):
+        """Consulta o diretório para descobrir o shard de um registro.
+
+        Args:
+            tabela (str): 'feirantes' ou 'produtos'
+            registro_id (int): ID do registro
+
+        Returns:
+            str: Nome do shard
+
+        Raises:
+            ValueError: Se o registro não estiver no diretório
+        """
+        conn = self.global_ops.get_connection()
+        try:
+            linha = conn.execute(
+                'SELECT shard FROM diretorio_shards WHERE tabela = ? AND registro_id = ?',
+                (tabela, registro_id)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if not linha:
+            raise ValueError(f"Registro {registro_id} de {tabela} não encontrado")
+        return linha[0]
+
+    def _inserir_e_registrar(self, shard, tabela, sql, params):
+        """Insere um registro em um shard e o registra no diretório, juntos.
+
+        O shard global é anexado (ATTACH) à conexão do shard, como em
+        ``_mover_feirante``, de modo que a inserção e a entrada no diretório
+        sejam confirmadas na mesma transação e nenhum registro fique fora do
+        diretório.
+
+        Args:
+            shard (str): Nome do shard
+            tabela (str): 'feirantes' ou 'produtos'
+            sql (str): Comando INSERT executado no shard
+            params (tuple): Parâmetros do comando
+
+        Returns:
+            int: ID do registro criado
+
+        Raises:
+            RuntimeError: Se o ID já estiver registrado no diretório
+        """
+        conn = sqlite3.connect(self.router.caminho(shard), timeout=30.0,
+                               isolation_level=None)
+        try:
+            conn.execute('ATTACH DATABASE ? AS dir', (self.router.caminho(SHARD_GLOBAL),))
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                registro_id = conn.execute(sql, params).lastrowid
+                try:
+                    conn.execute(
+                        'INSERT INTO dir.diretorio_shards (tabela, registro_id, shard) '
+                        'VALUES (?, ?, ?)',
+                        (tabela, registro_id, shard)
+                    )
+                except sqlite3.IntegrityError as exc:
+                    raise RuntimeError(
+                        f"Registro {registro_id} de {tabela} já consta no diretório de shards"
+                    ) from exc
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+
+        return registro_id
+
+    def _coordenadas_usuario(self, usuario_id):
+        """Busca no shard global a localização de um usuário.
+
+        Args:
+            usuario_id (int): ID do usuário
+
+        Returns:
+            tuple: (latitude, longitude)
+
+        Raises:
+            ValueError: Se o usuário não existir
+        """
+        conn = self.global_ops.get_connection()
+        try:
+            linha = conn.execute(
+                'SELECT latitude, longitude FROM usuarios WHERE id = ?', (usuario_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if not linha:
+            raise ValueError(f"Usuário {usuario_id} não encontrado")
+        return linha
+
+    def _coordenadas_feirante(self, shard, feirante_id):
+        """Busca a localização do usuário dono de um feirante.
+
+        Args:
+            shard (str): Nome do shard onde está o feirante
+            feirante_id (int): ID do feirante
+
+        Returns:
+            tuple: (latitude, longitude)
+
+        Raises:
+            ValueError: Se o feirante ou seu usuário não existirem
+        """
+        conn = self.shard(shard).get_connection()
+        try:
+            linha = conn.execute(
+                'SELECT usuario_id FROM feirantes WHERE id = ?', (feirante_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if not linha:
+            raise ValueError(f"Feirante {feirante_id} não encontrado")
+        return self._coordenadas_usuario(linha[0])
+
+    def shard_do_feirante(self, feirante_id):
+        """Retorna o shard onde está um feirante.
+
+        Args:
+            feirante_id (int): ID do feirante
+
+        Returns:
+            str: Nome do shard
+        """
+        return self._localizar('feirantes', feirante_id)
+
+    def shard_do_produto(self, produto_id):
+        """Retorna o shard onde está um produto.
+
+        Args:
+            produto_id (int): ID do produto
+
+        Returns:
+            str: Nome do shard
+        """
+        return self._localizar('produtos', produto_id)
+
+    def criar_usuario(self, usuario_data):
+        """Cria um novo usuário no shard global.
+
+        Args:
+            usuario_data (dict): Dados do usuário, como em DatabaseOperations.criar_usuario
+
+        Returns:
+            int: ID do usuário criado
+        """
+        return self.global_ops.criar_usuario(usuario_data)
+
+    def buscar_usuario_por_email(self, email):
+        """Busca um usuário pelo email no shard global.
+
+        Args:
+            email (str): Email do usuário a ser buscado
+
+        Returns:
+            tuple: Dados do usuário encontrado ou None se não encontrado
+        """
+        return self.global_ops.buscar_usuario_por_email(email)
+
+    def criar_feirante(self, feirante_data):
+        """Cria um feirante no shard da região de seu usuário.
+
+        Args:
+            feirante_data (dict): Dicionário com os dados do feirante:
+                - usuario_id (int): ID do usuário dono do estabelecimento
+                - nome_estabelecimento (str): Nome do estabelecimento
+                - descricao (str, optional): Descrição
+                - horario_funcionamento (str, optional): Horário de funcionamento
+                - dias_funcionamento (str, optional): Dias de funcionamento
+
+        Returns:
+            int: ID do feirante criado
+
+        Raises:
+            ValueError: Se o usuário não existir
+            RuntimeError: Se ocorrer erro ao criar o feirante
+        """
+        latitude, longitude = self._coordenadas_usuario(feirante_data['usuario_id'])
+        shard = self.router.shard_por_coordenadas(latitude, longitude)
+
+        try:
+            feirante_id = self._inserir_e_registrar(shard, 'feirantes', '''
+            INSERT INTO feirantes (
+                usuario_id, nome_estabelecimento, descricao,
+                horario_funcionamento, dias_funcionamento
+            ) VALUES (?, ?, ?, ?, ?)
+            ''', (
+                feirante_data['usuario_id'],
+                feirante_data['nome_estabelecimento'],
+                feirante_data.get('descricao'),
+                feirante_data.get('horario_funcionamento'),
+                feirante_data.get('dias_funcionamento')
+            ))
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao criar feirante: {exc}") from exc
+
+        return feirante_id
+
+    def criar_produto(self, produto_data):
+        """Cria um produto no mesmo shard do seu feirante.
+
+        Args:
+            produto_data (dict): Dicionário com os dados do produto:
+                - feirante_id (int): ID do feirante
+                - nome (str): Nome do produto
+                - preco (Decimal, int, float ou str): Preço do produto
+                - categoria_id (int): ID da categoria
+                - descricao (str, optional): Descrição
+                - quantidade_estoque (int, optional): Estoque inicial. Padrão: 0
+                - latitude (float, optional): Latitude do produto.
+                  Padrão: a do usuário dono do feirante
+                - longitude (float, optional): Longitude do produto.
+                  Padrão: a do usuário dono do feirante
+
+        Returns:
+            int: ID do produto criado
+
+        Raises:
+            ValueError: Se o feirante não existir
+            RuntimeError: Se ocorrer erro ao criar o produto
+        """
+        shard = self.shard_do_feirante(produto_data['feirante_id'])
+
+        # Produtos sem coordenadas nunca entrariam no filtro por retângulo da busca
+        latitude = produto_data.get('latitude')
+        longitude = produto_data.get('longitude')
+        if latitude is None or longitude is None:
+            latitude, longitude = self._coordenadas_feirante(shard, produto_data['feirante_id'])
+
+        try:
+            produto_id = self._inserir_e_registrar(shard, 'produtos', '''
+            INSERT INTO produtos (
+                feirante_id, nome, descricao, preco, quantidade_estoque,
+                categoria_id, latitude, longitude
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                produto_data['feirante_id'],
+                produto_data['nome'],
+                produto_data.get('descricao'),
+                para_centavos(produto_data['preco']),
+                produto_data.get('quantidade_estoque', 0),
+                produto_data['categoria_id'],
+                latitude,
+                longitude
+            ))
+        except Exception as exc:
+            raise RuntimeError(f"Erro ao criar produto: {exc}") from exc
+
+        return produto_id
+
+    def buscar_produtos_por_localizacao(self, latitude, longitude,
+                                        raio_km=10, categoria_id=None):
+        """Busca produtos em todos os shards que interceptam o raio de busca.
+
+        As consultas são executadas em paralelo, cada uma restrita ao retângulo
+        que contém o raio, e os resultados, já ordenados por avaliação em cada
+        shard, são intercalados mantendo a ordenação.
+
+        Args:
+            latitude (float): Latitude da localização de busca
+            longitude (float): Longitude da localização de busca
+            raio_km (int, optional): Raio de busca em km. Defaults to 10.
+            categoria_id (int, optional): ID da categoria para filtrar. Defaults to None.
+
+        Returns:
+            list: Lista de produtos encontrados
+
+        Raises:
+            RuntimeError: Se ocorrer erro na busca
+        """
+        shards = self.router.shards_no_raio(latitude, longitude, raio_km)
+
+        def buscar(shard):
+            return self.shard(shard).buscar_produtos_por_localizacao(
+                latitude, longitude, raio_km, categoria_id
+            )
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            resultados = list(executor.map(buscar, shards))
+
+        return list(heapq.merge(
+            *resultados, key=lambda produto: -produto[INDICE_AVALIACAO_BUSCA]
+        ))
+
+    def adicionar_ao_carrinho(self, usuario_id, produto_id, quantidade):
+        """Adiciona um produto ao carrinho do usuário no shard do produto.
+
+        Cada usuário tem um carrinho por shard em que possui itens.
+
+        Args:
+            usuario_id (int): ID do usuário
+            produto_id (int): ID do produto
+            quantidade (int): Quantidade a ser adicionada
+
+        Returns:
+            bool: True se a operação foi bem sucedida
+
+        Raises:
+            ValueError: Se o usuário ou o produto não existirem
+            RuntimeError: Se ocorrer erro ao adicionar ao carrinho
+        """
+        self._coordenadas_usuario(usuario_id)
+        shard = self.shard_do_produto(produto_id)
+        return self.shard(shard).adicionar_ao_carrinho(usuario_id, produto_id, quantidade)
+
+    def rebalancear(self):
+        """Move cada feirante para o shard indicado pelas regiões atuais do roteador.
+
+        Deve ser executado após alterar as regiões (por exemplo, ao dividir uma
+        região em duas). O feirante é movido com seus produtos, pedidos, itens
+        de pedido e itens de carrinho, mantendo os IDs.
+
+        Returns:
+            list: Tuplas (feirante_id, shard_origem, shard_destino) movidas
+
+        Raises:
+            RuntimeError: Se ocorrer erro ao mover um feirante
+        """
+        conn = self.global_ops.get_connection()
+        try:
+            origens = [linha[0] for linha in conn.execute(
+                "SELECT DISTINCT shard FROM diretorio_shards WHERE tabela = 'feirantes'"
+            )]
+        finally:
+            conn.close()
+
+        movidos = []
+        for origem in origens:
+            conn = self.shard(origem).get_connection()
+            try:
+                feirantes = conn.execute('SELECT id, usuario_id FROM feirantes').fetchall()
+            finally:
+                conn.close()
+
+            for feirante_id, usuario_id in feirantes:
+                latitude, longitude = self._coordenadas_usuario(usuario_id)
+                destino = self.router.shard_por_coordenadas(latitude, longitude)
+                if destino != origem:
+                    self._mover_feirante(feirante_id, origem, destino)
+                    movidos.append((feirante_id, origem, destino))
+
+        return movidos
+
+    def _mover_feirante(self, feirante_id, origem, destino):
+        """Move um feirante e seus dados entre shards em uma única transação.
+
+        Os shards de destino e global são anexados (ATTACH) à conexão do shard
+        de origem, de modo que a cópia, a remoção e a atualização do diretório
+        sejam confirmadas juntas.
+
+        Args:
+            feirante_id (int): ID do feirante
+            origem (str): Shard atual
+            destino (str): Novo shard
+
+        Raises:
+            RuntimeError: Se ocorrer erro ao mover o feirante
+        """
+        produtos = 'SELECT id FROM main.produtos WHERE feirante_id = :f'
+        pedidos = 'SELECT id FROM main.pedidos WHERE feirante_id = :f'
+        parametros = {'f': feirante_id, 'd': destino}
+
+        conn = sqlite3.connect(self.router.caminho(origem), timeout=30.0,
+                               isolation_level=None)
+        try:
+            conn.execute('ATTACH DATABASE ? AS alvo', (self.router.caminho(destino),))
+            conn.execute('ATTACH DATABASE ? AS dir', (self.router.caminho(SHARD_GLOBAL),))
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Inserções com IDs explícitos avançam a sequência do destino para o
+                # bloco de origem; ela é restaurada antes das inserções automáticas
+                sequencias = conn.execute(
+                    'SELECT name, seq FROM alvo.sqlite_sequence WHERE name IN '
+                    f"({', '.join('?' * len(TABELAS_REGIONAIS))})",
+                    TABELAS_REGIONAIS
+                ).fetchall()
+
+                conn.execute('INSERT INTO alvo.feirantes '
+                             'SELECT * FROM main.feirantes WHERE id = :f', parametros)
+                conn.execute('INSERT INTO alvo.produtos '
+                             'SELECT * FROM main.produtos WHERE feirante_id = :f', parametros)
+                conn.execute('INSERT INTO alvo.pedidos '
+                             'SELECT * FROM main.pedidos WHERE feirante_id = :f', parametros)
+                conn.execute('INSERT INTO alvo.itens_pedido SELECT * FROM main.itens_pedido '
+                             f'WHERE pedido_id IN ({pedidos})', parametros)
+
+                conn.executemany(
+                    'UPDATE alvo.sqlite_sequence SET seq = ? WHERE name = ?',
+                    [(seq, nome) for nome, seq in sequencias]
+                )
+
+                conn.execute(f'''
+                INSERT OR IGNORE INTO alvo.carrinhos (usuario_id)
+                SELECT DISTINCT c.usuario_id
+                FROM main.carrinhos c
+                JOIN main.itens_carrinho ic ON ic.carrinho_id = c.id
+                WHERE ic.produto_id IN ({produtos})
+                ''', parametros)
+                conn.execute(f'''
+                INSERT INTO alvo.itens_carrinho (carrinho_id, produto_id, quantidade)
+                SELECT ac.id, ic.produto_id, ic.quantidade
+                FROM main.itens_carrinho ic
+                JOIN main.carrinhos c ON c.id = ic.carrinho_id
+                JOIN alvo.carrinhos ac ON ac.usuario_id = c.usuario_id
+                WHERE ic.produto_id IN ({produtos})
+                ''', parametros)
+
+                conn.execute(f'''
+                UPDATE dir.diretorio_shards SET shard = :d
+                WHERE (tabela = 'feirantes' AND registro_id = :f)
+                   OR (tabela = 'produtos' AND registro_id IN ({produtos}))
+                ''', parametros)
+
+                conn.execute(f'DELETE FROM main.itens_carrinho WHERE produto_id IN ({produtos})',
+                             parametros)
+                conn.execute(f'DELETE FROM main.itens_pedido WHERE pedido_id IN ({pedidos})',
+                             parametros)
+                conn.execute('DELETE FROM main.pedidos WHERE feirante_id = :f', parametros)
+                conn.execute('DELETE FROM main.produtos WHERE feirante_id = :f', parametros)
+                conn.execute('DELETE FROM main.feirantes WHERE id = :f', parametros)
+
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as exc:
+            raise RuntimeError(
+                f"Erro ao mover feirante {feirante_id} de {origem} para {destino}: {exc}"
+            ) from exc
+        finally:
+            conn.close()
+
+
+def _parse_args(argv):
+    """Interpreta os argumentos de linha de comando.
+
+    Args:
+        argv (list): Argumentos de linha de comando (sem o nome do programa)
+
+    Returns:
+        argparse.Namespace: Argumentos interpretados
+    """
+    parser = argparse.ArgumentParser(
+        description='Ferramentas de administração dos shards regionais.'
+    )
+    parser.add_argument(
+        '--diretorio', default='shards',
+        help="diretório dos arquivos de shard (padrão: 'shards')"
+    )
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    inicializar = comandos.add_parser('inicializar', help='cria os arquivos de shard ausentes')
+    inicializar.add_argument('--dados-exemplo', action='store_true',
+                             help='insere as categorias de exemplo e as replica')
+    comandos.add_parser('rebalancear', help='move feirantes para o shard de sua região')
+    comandos.add_parser('status', help='exibe a quantidade de registros por shard')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Função principal das ferramentas de sharding.
+
+    Args:
+        argv (list, optional): Argumentos de linha de comando. Padrão: sys.argv[1:]
+
+    Returns:
+        int: Código de saída (0 em caso de sucesso)
+    """
+    args = _parse_args(argv)
+
+    try:
+        sharded = ShardedDatabaseOperations(ShardRouter(diretorio=args.diretorio))
+
+        if args.comando == 'rebalancear':
+            movidos = sharded.rebalancear()
+            for feirante_id, origem, destino in movidos:
+                print(f"Feirante {feirante_id}: {origem} -> {destino}")
+            print(f"{len(movidos)} feirante(s) movido(s)")
+        elif args.comando == 'status':
+            for nome in [SHARD_GLOBAL] + sharded.router.nomes():
+                conn = sqlite3.connect(sharded.router.caminho(nome))
+                contagens = [
+                    f"{tabela}={conn.execute(f'SELECT COUNT(*) FROM {tabela}').fetchone()[0]}"
+                    for tabela in ('usuarios', 'feirantes', 'produtos', 'pedidos')
+                ]
+                conn.close()
+                print(f"{nome:<14} {' '.join(contagens)}")
+        else:
+            if args.dados_exemplo:
+                bootstrap(sharded.router.caminho(SHARD_GLOBAL), dados_exemplo=True)
+                sharded.replicar_categorias()
+            print(f"Shards inicializados em {args.diretorio}")
+    except (RuntimeError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
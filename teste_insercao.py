@@ -3,7 +3,10 @@ Módulo para testes de inserção de usuários e feirantes no banco de dados.
 """
 
 import sqlite3
+from decimal import Decimal
+from create_database import bootstrap
 from database_operations import DatabaseOperations
+from money import de_centavos, para_centavos
 
 
 class TesteInsercao:
@@ -18,6 +21,25 @@ class TesteInsercao:
         self.db_name = db_name
         self.db_ops = DatabaseOperations(db_name)
 
+    def preparar_banco(self):
+        """Cria ou atualiza o esquema do banco antes das inserções.
+
+        Garante que bancos antigos, com preços em REAL, sejam migrados para
+        centavos antes de receber valores em centavos.
+
+        Returns:
+            bool: True se o esquema está atualizado
+        """
+        try:
+            criados = bootstrap(self.db_name, dados_exemplo=True)
+            if criados:
+                print(f"Esquema atualizado: {len(criados)} objeto(s) criado(s)")
+            return True
+
+        except Exception as error:
+            print(f"Erro ao preparar o banco: {error}")
+            return False
+
     def testar_conexao(self):
         """Testa a conexão com o banco de dados."""
         try:
@@ -137,7 +159,7 @@ class TesteInsercao:
                 feirante_id,
                 'Maçã Fuji Orgânica',
                 'Maçãs Fuji orgânicas, doces e crocantes',
-                8.50,
+                para_centavos(Decimal('8.50')),
                 100,
                 categoria_id,
                 -23.551000,
@@ -208,7 +230,7 @@ class TesteInsercao:
             print("\nULTIMOS PRODUTOS INSERIDOS:")
             for produto in produtos:
                 print(f"  ID: {produto[0]}, Nome: {produto[1]}, "
-                      f"Preço: R${produto[2]:.2f}, Estoque: {produto[3]}, "
+                      f"Preço: R${de_centavos(produto[2])}, Estoque: {produto[3]}, "
                       f"Categoria: {produto[4]}")
             
             conn.close()
@@ -221,8 +243,8 @@ class TesteInsercao:
         print("INICIANDO TESTES DE INSERCAO")
         print("="*50)
         
-        # Testar conexão
-        if not self.testar_conexao():
+        # Preparar esquema e testar conexão
+        if not self.preparar_banco() or not self.testar_conexao():
             return
         
         # Inserir usuários